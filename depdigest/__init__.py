@@ -2,6 +2,7 @@ from importlib.metadata import version, PackageNotFoundError
 from .core.checker import is_installed, check_dependency, get_info
 from .core.decorator import dep_digest
 from .core.loader import LazyRegistry
+from .core.import_guard import soft_import_guard, ImportLeakError
 from .core.config import (
     DepConfig,
     resolve_config,
@@ -9,6 +10,8 @@ from .core.config import (
     unregister_package_config,
     temporary_package_config,
     clear_package_configs,
+    get_config_epoch,
+    set_instrumentation_policy,
 )
 
 try:
@@ -31,10 +34,14 @@ __all__ = [
     'get_info',
     'dep_digest',
     'LazyRegistry',
+    'soft_import_guard',
+    'ImportLeakError',
     'DepConfig',
     'resolve_config',
     'register_package_config',
     'unregister_package_config',
     'temporary_package_config',
     'clear_package_configs',
+    'get_config_epoch',
+    'set_instrumentation_policy',
 ]
@@ -19,12 +19,24 @@ CATALOG = {
         "category": "dependency",
         "level": "ERROR",
     },
+    "incompatible_version": {
+        "code": "DEP-ERR-VERS-001",
+        "source": "depdigest.error.incompatible_version",
+        "category": "dependency",
+        "level": "ERROR",
+    },
     "plugin_load_failed": {
         "code": "DEP-DBG-LOAD-001",
         "source": "depdigest.debug.plugin_load_failed",
         "category": "loader",
         "level": "DEBUG",
     },
+    "plugin_import_profiled": {
+        "code": "DEP-DBG-PROF-001",
+        "source": "depdigest.debug.plugin_import_profiled",
+        "category": "loader",
+        "level": "DEBUG",
+    },
 }
 
 CODES = {
@@ -36,6 +48,14 @@ CODES = {
         "dev_message": "Dependency '{library}' missing in '{caller}'.",
         "dev_hint": "Add to requirements or environment. Docs: {doc_url}",
     },
+    "DEP-ERR-VERS-001": {
+        "title": "Incompatible Dependency Version",
+        "user_message": "Library '{library}' {installed_version} does not satisfy '{required_version}'.",
+        "qa_message": "Dependency '{library}' {installed_version} does not satisfy '{required_version}' in '{caller}'.",
+        "user_hint": "Install a compatible version via:\n  {pip_install}\n  {conda_install}\nDocs: {doc_url}",
+        "dev_message": "Dependency '{library}' {installed_version} does not satisfy '{required_version}' in '{caller}'.",
+        "dev_hint": "Align the environment with the version range declared in LIBRARIES. Docs: {doc_url}",
+    },
     "DEP-DBG-LOAD-001": {
         "title": "Plugin load failed",
         "user_message": "An optional plugin failed to load and was skipped.",
@@ -44,9 +64,19 @@ CODES = {
         "dev_message": "Plugin '{plugin}' failed to load in '{caller}': {error}.",
         "dev_hint": "Check dependency gates and import errors for optional plugins.",
     },
+    "DEP-DBG-PROF-001": {
+        "title": "Plugin import profiled",
+        "user_message": "Plugin '{plugin}' was imported in {duration_ms} ms.",
+        "qa_message": "Plugin '{plugin}' ({state}) imported in {duration_ms} ms in '{caller}': {memory_delta} bytes, {module_count} new modules.",
+        "user_hint": "No action is required.",
+        "dev_message": "Plugin '{plugin}' ({state}) imported in {duration_ms} ms in '{caller}': {memory_delta} bytes, {module_count} new modules: {new_modules}.",
+        "dev_hint": "Modules outside the plugin package show dependencies its import pulls in.",
+    },
 }
 
 SIGNALS = {
     "depdigest.error.missing_dependency": {"extra_required": ["library", "caller", "pip_install", "conda_install"]},
+    "depdigest.error.incompatible_version": {"extra_required": ["library", "caller", "installed_version", "required_version", "pip_install", "conda_install"]},
     "depdigest.debug.plugin_load_failed": {"extra_required": ["plugin", "caller", "error"]},
+    "depdigest.debug.plugin_import_profiled": {"extra_required": ["plugin", "caller", "state", "duration_ms", "memory_delta", "module_count", "new_modules"]},
 }
@@ -0,0 +1,110 @@
+"""On-disk cache files keyed by an environment fingerprint."""
+import hashlib
+import json
+import logging
+import os
+import site
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+CACHE_SCHEMA_VERSION = "1.0"
+
+
+def user_cache_dir() -> str:
+    """
+    Return the directory used for DepDigest cache files.
+
+    `DEPDIGEST_CACHE_DIR` overrides the platform default
+    (`~/.cache/depdigest`, `~/Library/Caches/depdigest` or
+    `%LOCALAPPDATA%\\depdigest`).
+    """
+    override = os.environ.get("DEPDIGEST_CACHE_DIR")
+    if override:
+        return override
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(base, "depdigest")
+
+
+def _site_packages_dirs() -> List[str]:
+    dirs = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    user_site = site.getusersitepackages() if hasattr(site, "getusersitepackages") else None
+    if isinstance(user_site, str):
+        dirs.append(user_site)
+    for path in sys.path:
+        if isinstance(path, str) and os.path.basename(path.rstrip(os.sep)) in {"site-packages", "dist-packages"}:
+            dirs.append(path)
+    return sorted(set(dirs))
+
+
+def environment_fingerprint() -> str:
+    """
+    Return a cheap fingerprint of the import environment.
+
+    It covers the interpreter path and version, `sys.path`, and the
+    modification times of the site-packages directories, so installing or
+    removing distributions changes it.
+    """
+    mtimes = []
+    for path in _site_packages_dirs():
+        try:
+            mtimes.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            mtimes.append((path, None))
+    material = json.dumps(
+        [sys.executable, sys.version, [p for p in sys.path if isinstance(p, str)], mtimes],
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def cache_file_path(kind: str, cache_dir: Optional[str] = None) -> str:
+    """Return the cache file for `kind`, one per interpreter."""
+    interpreter = hashlib.sha256(sys.executable.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir or user_cache_dir(), f"{kind}-{interpreter}.json")
+
+
+def _read_cache_file(path: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Return the cached payload if it exists and matches `fingerprint`."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("schema_version") != CACHE_SCHEMA_VERSION or payload.get("fingerprint") != fingerprint:
+        return None
+    data = payload.get("data")
+    return data if isinstance(data, dict) else None
+
+
+def _write_cache_file(path: str, fingerprint: str, data: Dict[str, Any]) -> bool:
+    """Atomically write `data` under `fingerprint`. Failures are non-fatal."""
+    payload = {
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "fingerprint": fingerprint,
+        "data": data,
+    }
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, sort_keys=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as exc:
+        logger.debug("Could not write DepDigest cache file %s: %s", path, exc)
+        return False
+    return True
@@ -1,34 +1,388 @@
 from importlib.util import find_spec
+from importlib import machinery
+from importlib.metadata import PackageNotFoundError, distributions, packages_distributions
+from importlib.metadata import version as _distribution_version
 from functools import lru_cache
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
+from zipimport import zipimporter
+import atexit
 import json
 import logging
+import os
+import re
+import sys
 from smonitor import signal
+from ..utils.version_tools import version_matches
+from . import cache as _cache
+from . import config as _config
+from .config import _bump_config_epoch
 
 logger = logging.getLogger(__name__)
-GET_INFO_SCHEMA_VERSION = "1.0"
+GET_INFO_SCHEMA_VERSION = "1.1"
 
 
 def _default_package_name(module_name: str) -> str:
     return module_name.split(".")[0]
 
+# Loaders whose packages expose their complete search path in the spec, so
+# submodules can be located without executing the package `__init__`.
+_PROBEABLE_LOADERS = (
+    machinery.SourceFileLoader,
+    machinery.SourcelessFileLoader,
+    machinery.ExtensionFileLoader,
+    machinery.NamespaceLoader,
+    zipimporter,
+)
+_UNRESOLVED = object()
+_STANDARD_FINDERS = (machinery.BuiltinImporter, machinery.FrozenImporter, machinery.PathFinder)
+
+# Every availability answer known to the process: computed by `is_installed`,
+# in bulk by `is_installed_many`, or loaded from the persistent cache.
+# Consulted by `is_installed` before probing and cleared with its cache.
+_KNOWN_AVAILABILITY: Dict[str, bool] = {}
+
+# Persistent cache state: target file (None when disabled) and the answers
+# the file currently holds.
+_PERSISTENT_CACHE_PATH: Optional[str] = None
+_PERSISTED_AVAILABILITY: Dict[str, bool] = {}
+_PERSISTED_DISTRIBUTIONS = False
+
+# Installed-distribution index, built lazily in one pass over the installed
+# metadata and cleared with the `is_installed` cache:
+# {"modules": {import_name: [dist, version]}, "distributions": {normalized_dist: [dist, version]}}
+_DISTRIBUTION_INDEX: Optional[Dict[str, Dict[str, List[str]]]] = None
+
+def _probe_spec(module_name: str):
+    """
+    Locate a module spec without importing its parent packages.
+
+    Parents are resolved recursively and their `submodule_search_locations`
+    are handed to the `sys.meta_path` finders, as the import system would do
+    after importing them. Returns `_UNRESOLVED` when a parent cannot be
+    searched that way (non-standard loader or failing finder).
+    """
+    parent_name, _, _ = module_name.rpartition(".")
+    if not parent_name or parent_name in sys.modules:
+        # Top-level names and children of imported packages never execute
+        # package code in `find_spec`.
+        return find_spec(module_name)
+
+    parent = _probe_spec(parent_name)
+    if parent is None or parent is _UNRESOLVED:
+        return parent
+    locations = parent.submodule_search_locations
+    if locations is None:
+        return None
+    if parent.loader is not None and not isinstance(parent.loader, _PROBEABLE_LOADERS):
+        return _UNRESOLVED
+
+    try:
+        for finder in sys.meta_path:
+            finder_find_spec = getattr(finder, "find_spec", None)
+            if finder_find_spec is None:
+                continue
+            spec = finder_find_spec(module_name, list(locations), None)
+            if spec is not None:
+                return spec
+    except Exception:
+        return _UNRESOLVED
+    return None
+
 @lru_cache(maxsize=None)
 def is_installed(module_name: str) -> bool:
-    """Check if a module is installed (cached)."""
+    """
+    Check if a module is installed (cached).
+
+    Dotted names are probed without importing their parent packages, so
+    checking `openmm.unit` does not execute `openmm/__init__.py`. Parents
+    served by non-standard loaders fall back to `importlib.util.find_spec`.
+    """
+    known = _KNOWN_AVAILABILITY.get(module_name)
+    if known is not None:
+        return known
     try:
-        return find_spec(module_name) is not None
+        spec = _probe_spec(module_name)
+        if spec is _UNRESOLVED:
+            spec = find_spec(module_name)
+        installed = spec is not None
     except (ImportError, ModuleNotFoundError):
+        installed = False
+    _KNOWN_AVAILABILITY[module_name] = installed
+    return installed
+
+_is_installed_cache_clear = is_installed.cache_clear
+
+def _clear_installation_cache():
+    """Clear the `is_installed` cache and invalidate dependent wrapper state."""
+    global _DISTRIBUTION_INDEX
+    _is_installed_cache_clear()
+    _KNOWN_AVAILABILITY.clear()
+    _DISTRIBUTION_INDEX = None
+    _bump_config_epoch()
+
+is_installed.cache_clear = _clear_installation_cache
+
+def _scan_top_level_names():
+    """
+    Index importable top-level names with one listing per `sys.path` entry.
+
+    Returns the set of names and whether it is complete, i.e. whether a name
+    missing from it cannot be found on `sys.path`. Zip archives and unreadable
+    entries make the index partial.
+    """
+    names = set(sys.builtin_module_names)
+    complete = True
+    suffixes = sorted(machinery.all_suffixes(), key=len, reverse=True)
+    for path in sys.path:
+        if not isinstance(path, str):
+            continue
+        try:
+            entries = os.scandir(path or ".")
+        except FileNotFoundError:
+            continue
+        except OSError:
+            complete = False
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir():
+                        # Regular packages and namespace package portions.
+                        if name.isidentifier():
+                            names.add(name)
+                        continue
+                except OSError:
+                    complete = False
+                    continue
+                for suffix in suffixes:
+                    if name.endswith(suffix):
+                        stem = name[:-len(suffix)]
+                        if stem.isidentifier():
+                            names.add(stem)
+                        break
+    return names, complete
+
+def _claimed_by_custom_finder(module_name: str):
+    """
+    Ask non-standard `sys.meta_path` finders (editable installs, import hooks)
+    about a top-level name. Returns None when a finder cannot answer.
+    """
+    for finder in sys.meta_path:
+        if finder in _STANDARD_FINDERS or isinstance(finder, _STANDARD_FINDERS):
+            continue
+        finder_find_spec = getattr(finder, "find_spec", None)
+        if finder_find_spec is None:
+            return None
+        try:
+            if finder_find_spec(module_name, None, None) is not None:
+                return True
+        except Exception:
+            return None
+    return False
+
+def is_installed_many(module_names: Iterable[str]) -> Dict[str, bool]:
+    """
+    Check several modules at once, filling the `is_installed` cache.
+
+    Top-level names are answered from a single listing of every `sys.path`
+    entry instead of one `find_spec` per name. Dotted names whose root is
+    available, and names the listing cannot settle, are probed individually.
+    """
+    names = list(dict.fromkeys(module_names))
+    pending = [name for name in names if name not in _KNOWN_AVAILABILITY]
+    if pending:
+        index, complete = _scan_top_level_names()
+        for name in pending:
+            root = _default_package_name(name)
+            if name in sys.modules or (name == root and name in index):
+                _KNOWN_AVAILABILITY[name] = True
+            elif complete and root not in index and root not in sys.modules:
+                claimed = _claimed_by_custom_finder(root)
+                if claimed is None:
+                    continue
+                if claimed and name != root:
+                    # Leave dotted names under a hooked root to the probe.
+                    continue
+                _KNOWN_AVAILABILITY[name] = claimed
+    result = {name: is_installed(name) for name in names}
+    _save_persistent_cache()
+    return result
+
+def _normalize_distribution_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def _build_distribution_index() -> Dict[str, Dict[str, List[str]]]:
+    dists: Dict[str, List[str]] = {}
+    for dist in distributions():
+        name = dist.metadata["Name"]
+        if not name:
+            continue
+        # First match wins, as on sys.path.
+        dists.setdefault(_normalize_distribution_name(name), [name, dist.version])
+    modules: Dict[str, List[str]] = {}
+    for top_level, names in packages_distributions().items():
+        for name in names:
+            entry = dists.get(_normalize_distribution_name(name))
+            if entry is not None:
+                modules[top_level] = entry
+                break
+    return {"modules": modules, "distributions": dists}
+
+def _distribution_index() -> Dict[str, Dict[str, List[str]]]:
+    global _DISTRIBUTION_INDEX
+    if _DISTRIBUTION_INDEX is None:
+        _DISTRIBUTION_INDEX = _build_distribution_index()
+    return _DISTRIBUTION_INDEX
+
+def installed_version(module_name: str, pypi_name: Optional[str] = None) -> Optional[str]:
+    """
+    Return the installed distribution version providing `module_name`.
+
+    The distribution is looked up by `pypi_name` when given, then by the
+    top-level import name. Returns None when no installed distribution is
+    known for it (for example, standard-library modules).
+    """
+    index = _distribution_index()
+    entry = None
+    if pypi_name:
+        entry = index["distributions"].get(_normalize_distribution_name(pypi_name))
+    if entry is None:
+        root = _default_package_name(module_name)
+        entry = index["modules"].get(root) or index["distributions"].get(_normalize_distribution_name(root))
+    return entry[1] if entry else None
+
+def _reported_version(module_name: str, pypi_name: Optional[str] = None) -> Optional[str]:
+    """
+    Return the installed version of a library that declares no version range.
+
+    Uses the distribution index if it was already built (or loaded from the
+    persistent cache); otherwise reads only the metadata of the distribution
+    named `pypi_name`, or named after the top-level module, so reporting
+    does not scan every installed distribution.
+    """
+    if _DISTRIBUTION_INDEX is not None:
+        return installed_version(module_name, pypi_name)
+    try:
+        return _distribution_version(pypi_name or _default_package_name(module_name))
+    except PackageNotFoundError:
+        return None
+
+def version_satisfied(module_name: str, specifier: Optional[str], pypi_name: Optional[str] = None) -> bool:
+    """
+    Return whether the installed version of `module_name` satisfies `specifier`.
+
+    Without a specifier, or when no distribution version is known for the
+    module, the requirement is considered satisfied.
+    """
+    if not specifier:
+        return True
+    version = installed_version(module_name, pypi_name)
+    return version is None or version_matches(version, specifier)
+
+def enable_persistent_cache(cache_dir: Optional[str] = None) -> bool:
+    """
+    Enable the on-disk availability cache for this process.
+
+    The cache file lives in `cache_dir` (default: `depdigest.core.cache.user_cache_dir()`)
+    and is loaded in a single read. It holds availability answers and, once
+    built, the installed-distribution index used for version checks. It is only used when its environment
+    fingerprint (interpreter, `sys.path`, site-packages mtimes) matches the
+    current one; otherwise it is ignored and rewritten. New answers are saved
+    after `is_installed_many` calls and at interpreter exit.
+
+    Returns True when a matching cache was loaded.
+    """
+    global _PERSISTENT_CACHE_PATH, _PERSISTED_AVAILABILITY, _PERSISTED_DISTRIBUTIONS, _DISTRIBUTION_INDEX
+    if _PERSISTENT_CACHE_PATH is None:
+        atexit.register(_save_persistent_cache)
+    _PERSISTENT_CACHE_PATH = _cache.cache_file_path("availability", cache_dir)
+    data = _cache._read_cache_file(_PERSISTENT_CACHE_PATH, _cache.environment_fingerprint())
+    availability = data.get("availability") if data else None
+    if not isinstance(availability, dict):
+        _PERSISTED_AVAILABILITY = {}
+        _PERSISTED_DISTRIBUTIONS = False
         return False
+    distribution_index = data.get("distributions")
+    _PERSISTED_DISTRIBUTIONS = isinstance(distribution_index, dict)
+    if _PERSISTED_DISTRIBUTIONS and _DISTRIBUTION_INDEX is None:
+        _DISTRIBUTION_INDEX = distribution_index
+    _PERSISTED_AVAILABILITY = {
+        name: value for name, value in availability.items() if isinstance(value, bool)
+    }
+    for name, value in _PERSISTED_AVAILABILITY.items():
+        _KNOWN_AVAILABILITY.setdefault(name, value)
+    return True
+
+def disable_persistent_cache():
+    """Stop reading and writing the on-disk availability cache."""
+    global _PERSISTENT_CACHE_PATH, _PERSISTED_AVAILABILITY, _PERSISTED_DISTRIBUTIONS
+    if _PERSISTENT_CACHE_PATH is not None:
+        atexit.unregister(_save_persistent_cache)
+    _PERSISTENT_CACHE_PATH = None
+    _PERSISTED_AVAILABILITY = {}
+    _PERSISTED_DISTRIBUTIONS = False
 
-@signal(tags=["dependency"], exception_level="DEBUG")
-def check_dependency(module_name: str, pypi_name: str = None, caller: str = None, exception_class: type = ImportError):
+def rebuild_persistent_cache() -> Dict[str, bool]:
+    """
+    Re-probe every known library and rewrite the on-disk availability cache.
+
+    Clears the `is_installed` cache first, so stale answers are discarded.
+    """
+    names = sorted(set(_KNOWN_AVAILABILITY) | set(_PERSISTED_AVAILABILITY))
+    is_installed.cache_clear()
+    result = is_installed_many(names)
+    _save_persistent_cache(force=True)
+    return result
+
+def _save_persistent_cache(force: bool = False):
+    global _PERSISTED_AVAILABILITY, _PERSISTED_DISTRIBUTIONS
+    if _PERSISTENT_CACHE_PATH is None:
+        return
+    new_distributions = _DISTRIBUTION_INDEX is not None and not _PERSISTED_DISTRIBUTIONS
+    if not force and not new_distributions and _KNOWN_AVAILABILITY.items() <= _PERSISTED_AVAILABILITY.items():
+        return
+    availability = dict(_KNOWN_AVAILABILITY)
+    data = {"availability": availability}
+    if _DISTRIBUTION_INDEX is not None:
+        data["distributions"] = _DISTRIBUTION_INDEX
+    if _cache._write_cache_file(_PERSISTENT_CACHE_PATH, _cache.environment_fingerprint(), data):
+        _PERSISTED_AVAILABILITY = availability
+        _PERSISTED_DISTRIBUTIONS = _DISTRIBUTION_INDEX is not None
+
+def check_dependency(module_name: str, pypi_name: str = None, caller: str = None, exception_class: type = ImportError,
+                     version: str = None):
     """
     Check if a dependency is installed. Raises the specified exception if missing.
+
+    If `version` is a specifier such as ``">=1.2,<2"``, the installed
+    distribution version must also satisfy it.
+
+    SMonitor instrumentation follows the global policy set with
+    `set_instrumentation_policy`; failing checks are always instrumented.
     """
+    if (
+        _config._sampled(_config._INSTRUMENTATION_RATE)
+        or not is_installed(module_name)
+        or not version_satisfied(module_name, version, pypi_name)
+    ):
+        _instrumented_check_dependency(module_name, pypi_name, caller, exception_class, version)
+
+def _raise_dependency_error(exception_class: type, lib_name: str, caller: str, msg: str):
+    try:
+        raise exception_class(library=lib_name, caller=caller, message=msg)
+    except TypeError:
+        try:
+            raise exception_class(library=lib_name, caller=caller)
+        except TypeError:
+            raise exception_class(msg)
+
+def _check_dependency(module_name: str, pypi_name: str = None, caller: str = None, exception_class: type = ImportError,
+                      version: str = None):
+    install_name = pypi_name or _default_package_name(module_name)
+    conda_name = _default_package_name(module_name)
+    lib_name = pypi_name or module_name
     if not is_installed(module_name):
-        install_name = pypi_name or _default_package_name(module_name)
-        conda_name = _default_package_name(module_name)
-        lib_name = pypi_name or module_name
         from smonitor.integrations import emit_from_catalog, merge_extra
         from .._private.smonitor.catalog import CATALOG, PACKAGE_ROOT, META
 
@@ -66,13 +420,49 @@ def check_dependency(module_name: str, pypi_name: str = None, caller: str = None
         if META.get("doc_url"):
             msg += f"\nDocumentation: {META['doc_url']}"
 
+        _raise_dependency_error(exception_class, lib_name, caller, msg)
+
+    if not version_satisfied(module_name, version, pypi_name):
+        installed = installed_version(module_name, pypi_name)
+        from smonitor.integrations import emit_from_catalog, merge_extra
+        from .._private.smonitor.catalog import CATALOG, PACKAGE_ROOT, META
+
         try:
-            raise exception_class(library=lib_name, caller=caller, message=msg)
-        except TypeError:
-            try:
-                raise exception_class(library=lib_name, caller=caller)
-            except TypeError:
-                raise exception_class(msg)
+            emit_from_catalog(
+                CATALOG["incompatible_version"],
+                package_root=PACKAGE_ROOT,
+                extra=merge_extra(META, {
+                    "library": lib_name,
+                    "caller": caller or "",
+                    "installed_version": installed,
+                    "required_version": version,
+                    "pip_install": f"pip install '{install_name}{version}'",
+                    "conda_install": f"conda install -c conda-forge '{conda_name}{version}'",
+                }),
+            )
+        except Exception as emit_error:
+            logger.warning(
+                "SMonitor emission failed in check_dependency: signal=incompatible_version caller=%s library=%s error=%s",
+                caller or "",
+                lib_name,
+                emit_error,
+            )
+
+        msg = f"The library '{module_name}' {version} is required"
+        if caller:
+            msg += f" for '{caller}'"
+        msg += f", but version {installed} is installed."
+        msg += (
+            f"\nInstall a compatible version with:\n"
+            f"  conda install -c conda-forge '{conda_name}{version}'\n"
+            f"  pip install '{install_name}{version}'"
+        )
+        if META.get("doc_url"):
+            msg += f"\nDocumentation: {META['doc_url']}"
+
+        _raise_dependency_error(exception_class, lib_name, caller, msg)
+
+_instrumented_check_dependency = signal(tags=["dependency"], exception_level="DEBUG")(_check_dependency)
 
 def get_info(module_path: str, format: str = "table") -> Any:
     """
@@ -96,16 +486,33 @@ def get_info(module_path: str, format: str = "table") -> Any:
     cfg = resolve_config(module_path)
 
     deps = []
+    availability = is_installed_many(sorted(cfg.libraries))
     for key, info in sorted(cfg.libraries.items(), key=lambda item: item[0]):
         default_name = _default_package_name(key)
         pypi_name = info.get("pypi", default_name)
         conda_name = info.get("conda", default_name)
-        installed = is_installed(key)
+        installed = availability[key]
+        version_spec = info.get("version")
+        if not installed:
+            version = None
+        elif version_spec:
+            version = installed_version(key, info.get("pypi"))
+        else:
+            version = _reported_version(key, info.get("pypi"))
+        compatible = installed and version_satisfied(key, version_spec, info.get("pypi"))
+        if not installed:
+            status = "missing"
+        elif not compatible:
+            status = "incompatible"
+        else:
+            status = "installed"
         deps.append(
             {
                 "library": key,
                 "installed": installed,
-                "status": "installed" if installed else "missing",
+                "status": status,
+                "version": version,
+                "version_spec": version_spec,
                 "type": info.get("type", "soft"),
                 "package_name": {
                     "pypi": pypi_name,
@@ -127,6 +534,7 @@ def get_info(module_path: str, format: str = "table") -> Any:
         "dependency_count": len(deps),
         "installed_count": sum(1 for dep in deps if dep["installed"]),
         "missing_count": sum(1 for dep in deps if not dep["installed"]),
+        "incompatible_count": sum(1 for dep in deps if dep["status"] == "incompatible"),
         "dependencies": deps,
     }
 
@@ -136,7 +544,11 @@ def get_info(module_path: str, format: str = "table") -> Any:
             rows.append(
                 {
                     "Library": dep["library"],
-                    "Status": "Installed" if dep["installed"] else "Not Installed",
+                    "Status": {
+                        "installed": "Installed",
+                        "incompatible": "Incompatible",
+                        "missing": "Not Installed",
+                    }[dep["status"]],
                     "Type": dep["type"].capitalize(),
                     "Install (PyPI)": dep["install"]["pypi"],
                     "Install (Conda)": dep["install"]["conda"],
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import random
+import re
 from dataclasses import dataclass, field
 from importlib import import_module
 from typing import Any, Dict, Optional, Type
@@ -11,9 +13,85 @@ class DepConfig:
     mapping: Dict[str, str] = field(default_factory=dict)
     show_all_capabilities: bool = True
     exception_class: Type[Exception] = ImportError
+    instrumentation: Optional[str] = None
+
+    def __post_init__(self):
+        if self.instrumentation is not None:
+            _instrumentation_rate(self.instrumentation)
+
+_SAMPLED_POLICY = re.compile(r"sampled\(\s*([^)]*?)\s*\)")
+
+def _instrumentation_rate(policy: str) -> float:
+    """Translate an instrumentation policy into an instrumented-success rate."""
+    if policy == "always":
+        return 1.0
+    if policy == "errors-only":
+        return 0.0
+    match = _SAMPLED_POLICY.fullmatch(policy) if isinstance(policy, str) else None
+    if match:
+        try:
+            rate = float(match.group(1))
+        except ValueError:
+            rate = -1.0
+        if 0.0 <= rate <= 1.0:
+            return rate
+    raise ValueError(
+        "instrumentation must be 'always', 'errors-only' or 'sampled(<rate>)' "
+        "with 0 <= rate <= 1"
+    )
+
+def _sampled(rate: float) -> bool:
+    """Return whether a successful call should go through smonitor instrumentation."""
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
 
 _PACKAGE_CONFIGS: Dict[str, DepConfig] = {}
 
+# Incremented whenever package configuration or dependency availability may
+# have changed. `@dep_digest` wrappers cache resolved state against it.
+_CONFIG_EPOCH = 0
+
+def _bump_config_epoch():
+    global _CONFIG_EPOCH
+    _CONFIG_EPOCH += 1
+
+def get_config_epoch() -> int:
+    """
+    Return the current configuration epoch.
+
+    The epoch increases monotonically every time package configurations are
+    registered, unregistered, cleared or temporarily overridden, and whenever
+    the `resolve_config` or `is_installed` caches are cleared. Host libraries
+    can key their own caches on it.
+    """
+    return _CONFIG_EPOCH
+
+_INSTRUMENTATION_RATE = 1.0
+
+def set_instrumentation_policy(policy: str):
+    """
+    Set the global smonitor instrumentation policy for dependency checks.
+
+    Parameters
+    ----------
+    policy
+        One of:
+        - "always": every guarded call is instrumented (default).
+        - "errors-only": only failing checks go through smonitor.
+        - "sampled(rate)": failing checks are always instrumented and
+          successful ones with probability `rate`.
+
+    Packages can override it with `DepConfig(instrumentation=...)` or an
+    `INSTRUMENTATION` attribute in `_depdigest.py`.
+    """
+    global _INSTRUMENTATION_RATE
+    _INSTRUMENTATION_RATE = _instrumentation_rate(policy)
+    _bump_config_epoch()
+
+def _config_instrumentation_rate(config: DepConfig) -> float:
+    if config.instrumentation is None:
+        return _INSTRUMENTATION_RATE
+    return _instrumentation_rate(config.instrumentation)
+
 def register_package_config(package_name: str, config: DepConfig):
     """Manually register a configuration for a package root."""
     if not package_name or not isinstance(package_name, str):
@@ -69,9 +147,19 @@ def resolve_config(module_path: Optional[str]) -> DepConfig:
             libraries=getattr(module, "LIBRARIES", {}),
             mapping=getattr(module, "MAPPING", {}),
             show_all_capabilities=getattr(module, "SHOW_ALL_CAPABILITIES", True),
-            exception_class=getattr(module, "EXCEPTION_CLASS", ImportError)
+            exception_class=getattr(module, "EXCEPTION_CLASS", ImportError),
+            instrumentation=getattr(module, "INSTRUMENTATION", None),
         )
     except ModuleNotFoundError as exc:
         if exc.name == config_module_path:
             return DepConfig()
         raise
+
+_resolve_config_cache_clear = resolve_config.cache_clear
+
+def _clear_resolved_configs():
+    """Clear the `resolve_config` cache and invalidate dependent wrapper state."""
+    _resolve_config_cache_clear()
+    _bump_config_epoch()
+
+resolve_config.cache_clear = _clear_resolved_configs
@@ -1,10 +1,34 @@
 import inspect
+import weakref
 from functools import wraps
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from . import checker as _checker
 from .checker import check_dependency
+from . import config as _config
 from .config import resolve_config
 from smonitor import signal
 
+_MISSING = object()
+_VARIADIC_KINDS = (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+
+
+class _Requirement(NamedTuple):
+    library: str
+    when: Optional[Dict[str, Any]]
+    accessors: Optional[tuple]
+
+
+class _GuardSpec(NamedTuple):
+    func: Callable
+    requirements: Tuple[_Requirement, ...]
+    specialize: bool
+
+
+# Maps each depdigest wrapper to the spec it was built from, so stacked
+# decorators can be merged. Keyed by identity: a foreign wrapper that copied
+# our attributes via functools.wraps is never mistaken for a guard.
+_GUARDS: "weakref.WeakKeyDictionary[Callable, _GuardSpec]" = weakref.WeakKeyDictionary()
+
 
 def _condition_value_matches(value: Any, expected: Any) -> bool:
     """Return whether a runtime argument satisfies a conditional dependency.
@@ -40,10 +64,222 @@ def _condition_value_matches(value: Any, expected: Any) -> bool:
     return False
 
 
-def dep_digest(library: str, when: Optional[Dict[str, Any]] = None):
+def _compile_conditions(sig: inspect.Signature, when: Dict[str, Any]):
+    """Compile ``when`` keys into direct argument accessors.
+
+    Each accessor is a ``(index, name, default, expected)`` tuple: ``index`` is
+    the positional slot (or ``None``), ``name`` the keyword under which the
+    argument may be passed (or ``None``), and ``default`` the value used when the
+    caller omits it. Keys that do not name a parameter never match, mirroring
+    ``Signature.bind``. Returns ``None`` when a key targets ``*args`` or
+    ``**kwargs``, in which case conditions are evaluated by binding.
+    """
+
+    parameters = list(sig.parameters.values())
+    accessors = []
+    for key, expected in when.items():
+        param = sig.parameters.get(key)
+        if param is None:
+            accessors.append((None, None, _MISSING, expected))
+            continue
+        if param.kind in _VARIADIC_KINDS:
+            return None
+
+        index = None
+        if param.kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        ):
+            index = parameters.index(param)
+        name = None if param.kind is inspect.Parameter.POSITIONAL_ONLY else key
+        default = _MISSING if param.default is inspect.Parameter.empty else param.default
+        accessors.append((index, name, default, expected))
+    return tuple(accessors)
+
+
+def _compiled_conditions_match(accessors, args: tuple, kwargs: dict) -> bool:
+    for index, name, default, expected in accessors:
+        if index is not None and index < len(args):
+            value = args[index]
+        elif name is not None:
+            value = kwargs.get(name, default)
+        else:
+            value = default
+        if value is _MISSING or not _condition_value_matches(value, expected):
+            return False
+    return True
+
+
+def _bound_conditions_match(sig: inspect.Signature, when: Dict[str, Any], args: tuple, kwargs: dict) -> bool:
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    args_dict = bound.arguments
+    for k, v in when.items():
+        if k not in args_dict or not _condition_value_matches(args_dict[k], v):
+            return False
+    return True
+
+
+def _requirement_applies(req: _Requirement, sig: inspect.Signature, args: tuple, kwargs: dict) -> bool:
+    if req.when is None:
+        return True
+    if req.accessors is not None:
+        return _compiled_conditions_match(req.accessors, args, kwargs)
+    return _bound_conditions_match(sig, req.when, args, kwargs)
+
+
+def _resolve_requirements(module_path: str, requirements: Tuple[_Requirement, ...]) -> tuple:
+    cfg = resolve_config(module_path)
+    metadata = []
+    for req in requirements:
+        lib_info = cfg.libraries.get(req.library, {})
+        metadata.append((lib_info.get('pypi'), cfg.exception_class, lib_info.get('version')))
+    metadata = tuple(metadata)
+    return metadata, _config._config_instrumentation_rate(cfg)
+
+
+def _build_guard(func: Callable, requirements: Tuple[_Requirement, ...], specialize: bool) -> Callable:
+    sig = inspect.signature(func)
+    module_path = func.__module__
+    caller = func.__name__
+    unconditional = all(req.when is None for req in requirements)
+    can_specialize = specialize and unconditional
+    verified_epoch = -1
+    # (epoch, ((pypi_name, exception_class, version), ...), instrumentation rate)
+    resolved = (-1, (), 1.0)
+
+    def refresh():
+        # RESOLVE CONFIG AT RUNTIME
+        # This allows tests to register config AFTER function definition.
+        # Resolution is cached per wrapper until the configuration epoch moves.
+        nonlocal resolved
+        epoch = _config._CONFIG_EPOCH
+        if resolved[0] != epoch:
+            resolved = (epoch,) + _resolve_requirements(module_path, requirements)
+        return resolved
+
+    def unmet(args, kwargs, metadata) -> bool:
+        for req, (pypi_name, _, version) in zip(requirements, metadata):
+            if not _requirement_applies(req, sig, args, kwargs):
+                continue
+            if not _checker.is_installed(req.library) or not _checker.version_satisfied(req.library, version, pypi_name):
+                return True
+        return False
+
+    def check(args, kwargs):
+        nonlocal verified_epoch
+        epoch, metadata, _ = refresh()
+        for req, (pypi_name, exception_class, version) in zip(requirements, metadata):
+            if not _requirement_applies(req, sig, args, kwargs):
+                continue
+            check_dependency(req.library, pypi_name=pypi_name, caller=caller,
+                             exception_class=exception_class, version=version)
+        if can_specialize:
+            verified_epoch = epoch
+
+    def needs_instrumentation(args, kwargs) -> bool:
+        # Failing checks always go through smonitor; successful ones only
+        # when the instrumentation policy samples them.
+        nonlocal verified_epoch
+        epoch, metadata, rate = refresh()
+        if _config._sampled(rate) or unmet(args, kwargs, metadata):
+            return True
+        if can_specialize:
+            verified_epoch = epoch
+        return False
+
+    # SPECIALIZED FAST PATH
+    # In every wrapper kind, once verified for the current epoch, config
+    # resolution, dependency checking and instrumentation are skipped.
+    if inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func):
+        # smonitor signals are synchronous: only the entry check is
+        # instrumented, it runs once when the body starts executing.
+        instrumented_check = signal(tags=["dependency"], exception_level="DEBUG")(check)
+
+        def enter(args, kwargs):
+            if needs_instrumentation(args, kwargs):
+                instrumented_check(args, kwargs)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if verified_epoch != _config._CONFIG_EPOCH:
+                    enter(args, kwargs)
+                return await func(*args, **kwargs)
+        elif inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if verified_epoch != _config._CONFIG_EPOCH:
+                    enter(args, kwargs)
+                # There is no `yield from` for async generators: forward
+                # values, sent values, exceptions and close explicitly.
+                agen = func(*args, **kwargs)
+                try:
+                    value = await agen.__anext__()
+                    while True:
+                        try:
+                            sent = yield value
+                        except GeneratorExit:
+                            await agen.aclose()
+                            raise
+                        except BaseException as exc:
+                            value = await agen.athrow(exc)
+                        else:
+                            value = await agen.asend(sent)
+                except StopAsyncIteration:
+                    return
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if verified_epoch != _config._CONFIG_EPOCH:
+                    enter(args, kwargs)
+                return (yield from func(*args, **kwargs))
+    else:
+        @signal(tags=["dependency"], exception_level="DEBUG")
+        def instrumented(*args, **kwargs):
+            check(args, kwargs)
+            return func(*args, **kwargs)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if verified_epoch == _config._CONFIG_EPOCH or not needs_instrumentation(args, kwargs):
+                return func(*args, **kwargs)
+            return instrumented(*args, **kwargs)
+
+    _GUARDS[wrapper] = _GuardSpec(func, requirements, specialize)
+    return wrapper
+
+
+def dep_digest(library: str, when: Optional[Dict[str, Any]] = None, specialize: bool = False):
     """
     Decorator to declare and enforce a dependency.
     Resolved dynamically at runtime to support configuration changes.
+
+    Stacked `@dep_digest` decorators are merged into a single wrapper that
+    checks every declared (library, when) pair in one pass, outermost first.
+
+    Parameters
+    ----------
+    library
+        Importable name of the required library.
+    when
+        Optional mapping of argument names to values; the dependency is only
+        enforced when every condition matches the call arguments.
+    specialize
+        If True, an unconditional wrapper becomes a pass-through after its
+        first successful check. The verified state is tied to the
+        configuration epoch, so `register_package_config`,
+        `temporary_package_config`, `clear_package_configs` and
+        `is_installed.cache_clear()` force a new check. When decorators are
+        stacked, every layer must request it.
+
+    Coroutine, generator and async generator functions get wrappers of the
+    same kind, so framework introspection keeps working; checks run once when
+    the wrapped body starts.
+
+    SMonitor instrumentation of guarded calls follows the package
+    `DepConfig.instrumentation` policy, or the global one set with
+    `set_instrumentation_policy`.
     """
     def decorator(func: Callable):
         # 1. Metadata Registration (Still at definition time)
@@ -51,37 +287,15 @@ def dep_digest(library: str, when: Optional[Dict[str, Any]] = None):
             func._dependencies = []
         func._dependencies.append({'library': library, 'when': when})
 
-        # Pre-compute signature
-        sig = inspect.signature(func)
-        module_path = func.__module__
+        # 2. Collapse onto an existing depdigest wrapper, if any
+        spec = _GUARDS.get(func)
+        if spec is not None:
+            target, inner, specialize_all = spec.func, spec.requirements, spec.specialize and specialize
+        else:
+            target, inner, specialize_all = func, (), specialize
 
-        @wraps(func)
-        @signal(tags=["dependency"], exception_level="DEBUG")
-        def wrapper(*args, **kwargs):
-            # 2. RESOLVE CONFIG AT RUNTIME
-            # This allows tests to register config AFTER function definition
-            cfg = resolve_config(module_path)
-            
-            should_check = True
-            if when is not None:
-                bound = sig.bind(*args, **kwargs)
-                bound.apply_defaults()
-                args_dict = bound.arguments
-                for k, v in when.items():
-                    if k not in args_dict or not _condition_value_matches(
-                        args_dict[k],
-                        v,
-                    ):
-                        should_check = False
-                        break
-            
-            if should_check:
-                lib_info = cfg.libraries.get(library, {})
-                pypi_name = lib_info.get('pypi')
-                check_dependency(library, pypi_name=pypi_name, caller=func.__name__, 
-                                 exception_class=cfg.exception_class)
-                
-            return func(*args, **kwargs)
-        
-        return wrapper
+        sig = inspect.signature(target)
+        accessors = _compile_conditions(sig, when) if when is not None else None
+        requirement = _Requirement(library, when, accessors)
+        return _build_guard(target, (requirement,) + inner, specialize_all)
     return decorator
@@ -0,0 +1,186 @@
+"""Runtime guard against imports of soft dependencies."""
+import sys
+import threading
+import traceback
+from typing import Any, Dict, Iterable, List, Optional, Set
+from .config import resolve_config
+
+
+class ImportLeakError(AssertionError):
+    """
+    A soft dependency was imported inside a strict `soft_import_guard`.
+
+    It is not an ImportError, so `try: import x / except ImportError`
+    fallbacks in the guarded code cannot swallow it.
+    """
+
+
+class _SoftImportFinder:
+    """
+    `sys.meta_path` hook shared by every active guard.
+
+    It never finds modules itself: it reports imports of watched names to the
+    guards and returns None, letting the real finders run. It sits on
+    `sys.meta_path` only while at least one guard is active.
+    """
+
+    def __init__(self):
+        # Replaced, never mutated, so `find_spec` can iterate without a lock.
+        self.guards: tuple = ()
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None):
+        root = fullname.partition(".")[0]
+        for guard in self.guards:
+            if root in guard._roots:
+                break
+        else:
+            return None
+        if not _called_by_import_system():
+            return None
+        for guard in self.guards:
+            if root in guard._roots:
+                guard._observe(fullname)
+        return None
+
+
+_FINDER = _SoftImportFinder()
+_FINDER_LOCK = threading.Lock()
+
+
+def _called_by_import_system() -> bool:
+    """
+    Whether the running `find_spec` call comes from an import statement.
+
+    Availability probes (`is_installed`, `importlib.util.find_spec`) also ask
+    the meta path finders, but do not import anything.
+    """
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith("<frozen importlib"):
+        if frame.f_code.co_name == "_find_and_load_unlocked":
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _parents(module_name: str) -> List[str]:
+    parts = module_name.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+
+class ImportLeakGuard:
+    """
+    Records imports of soft dependencies while it is active.
+
+    Use it through `soft_import_guard`. `leaks` lists one record per
+    imported module: `module`, `library` (the declared soft dependency it
+    belongs to) and `stack` (the formatted stack of the import).
+    """
+
+    def __init__(self, package_prefix: str, strict: bool = False, libraries: Optional[Iterable[str]] = None):
+        self.package_prefix = package_prefix
+        self.strict = strict
+        self.leaks: List[Dict[str, Any]] = []
+        if libraries is None:
+            cfg = resolve_config(package_prefix)
+            soft = [name for name, info in cfg.libraries.items() if info.get("type") == "soft"]
+            hard = [name for name, info in cfg.libraries.items() if info.get("type") != "soft"]
+        else:
+            soft, hard = list(libraries), []
+        self._soft: Set[str] = set(soft)
+        # Importing "openmm.unit" imports "openmm" first; parents are watched
+        # too unless another declared dependency needs them.
+        needed = set(hard)
+        for name in hard:
+            needed.update(_parents(name))
+        self._watched: Dict[str, str] = {name: name for name in soft}
+        for name in soft:
+            for parent in _parents(name):
+                if parent not in needed:
+                    self._watched.setdefault(parent, name)
+        self._roots = frozenset(name.partition(".")[0] for name in self._watched)
+        self._active = False
+
+    def _library_of(self, fullname: str) -> Optional[str]:
+        library = self._watched.get(fullname)
+        if library is not None:
+            return library
+        for parent in _parents(fullname):
+            if parent in self._soft:
+                return parent
+        return None
+
+    def _observe(self, fullname: str):
+        library = self._library_of(fullname)
+        if library is None:
+            return
+        # Drop this module's and the import machinery's frames.
+        frames = [
+            frame for frame in traceback.extract_stack()[:-2]
+            if not frame.filename.startswith("<frozen importlib")
+        ]
+        self.leaks.append({
+            "module": fullname,
+            "library": library,
+            "stack": "".join(traceback.format_list(frames)),
+        })
+        if self.strict:
+            raise ImportLeakError(self._message(self.leaks[-1]))
+
+    def _message(self, leak: Dict[str, Any]) -> str:
+        return (
+            f"Soft dependency {leak['library']!r} was imported ({leak['module']!r}) "
+            f"inside a soft_import_guard for {self.package_prefix!r}:\n{leak['stack']}"
+        )
+
+    def start(self) -> "ImportLeakGuard":
+        with _FINDER_LOCK:
+            if not self._active:
+                if not _FINDER.guards and _FINDER not in sys.meta_path:
+                    sys.meta_path.insert(0, _FINDER)
+                _FINDER.guards = _FINDER.guards + (self,)
+                self._active = True
+        return self
+
+    def stop(self):
+        with _FINDER_LOCK:
+            if not self._active:
+                return
+            _FINDER.guards = tuple(guard for guard in _FINDER.guards if guard is not self)
+            self._active = False
+            if not _FINDER.guards and _FINDER in sys.meta_path:
+                sys.meta_path.remove(_FINDER)
+
+    def __enter__(self) -> "ImportLeakGuard":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        # A strict failure swallowed by the guarded code is raised here.
+        if self.strict and self.leaks and exc_type is None:
+            raise ImportLeakError(self._message(self.leaks[0]))
+        return False
+
+
+def soft_import_guard(package_prefix: str, strict: bool = False,
+                      libraries: Optional[Iterable[str]] = None) -> ImportLeakGuard:
+    """
+    Guard a block of code against importing soft dependencies.
+
+    Parameters
+    ----------
+    package_prefix
+        Package whose DepDigest configuration declares the soft dependencies
+        (`LIBRARIES` entries with `type == "soft"`).
+    strict
+        If True, the first such import raises `ImportLeakError`; otherwise
+        imports proceed and are only recorded in `guard.leaks`.
+    libraries
+        Module names to watch instead of the configured soft dependencies.
+
+    Only imports that reach the import system are seen: a module already in
+    `sys.modules` when the block runs is not reported. The guard is
+    process-wide, so imports from other threads during the block are
+    recorded too. Imports of unwatched top-level packages cost one set
+    lookup while a guard is active, and nothing otherwise.
+    """
+    return ImportLeakGuard(package_prefix, strict=strict, libraries=libraries)
@@ -1,77 +1,1192 @@
 import os
+import pkgutil
+import sys
+import hashlib
+import json
 import logging
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
-from importlib.metadata import entry_points
-from typing import Dict, Any, Optional, Callable, Iterable
-from .checker import is_installed
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Any, Optional, Callable, Iterable, List, Tuple
+from .cache import _read_cache_file, _write_cache_file, cache_file_path, environment_fingerprint
+from .checker import check_dependency, is_installed
 from .config import resolve_config
+from ..utils.ast_tools import extract_literal_assignment
 from smonitor import signal
 
 logger = logging.getLogger(__name__)
 
+# Entry points of every group, shared by all registries and rebuilt when
+# the environment fingerprint changes.
+_ENTRY_POINT_INDEX: Dict[str, Any] = {"fingerprint": None, "groups": {}, "complete": False}
+_ENTRY_POINT_LOCK = threading.Lock()
+
+
+def _index_entry_points(eps: Any) -> Optional[Dict[str, tuple]]:
+    """Group one `entry_points()` result by group, or None if it cannot be listed."""
+    if not (hasattr(eps, "groups") and hasattr(eps, "select")):
+        return None
+    groups: Dict[str, list] = {}
+    for ep in eps:
+        groups.setdefault(ep.group, []).append(ep)
+    return {group: tuple(members) for group, members in groups.items()}
+
+
+def _entry_points_for_group(group: str) -> tuple:
+    """
+    Return the entry points of `group` from the process-wide index.
+
+    The index is built from a single `entry_points()` call, which reads the
+    metadata of every installed distribution once, and is reused by every
+    registry until the environment fingerprint changes.
+    """
+    fingerprint = environment_fingerprint()
+    with _ENTRY_POINT_LOCK:
+        index = _ENTRY_POINT_INDEX
+        if index["fingerprint"] != fingerprint:
+            index.update(fingerprint=fingerprint, groups={}, complete=False)
+        if not index["complete"] and group not in index["groups"]:
+            eps = entry_points()
+            groups = _index_entry_points(eps)
+            if groups is not None:
+                index["groups"] = groups
+                index["complete"] = True
+            elif hasattr(eps, "select"):
+                index["groups"][group] = tuple(eps.select(group=group))
+            else:
+                index["groups"][group] = tuple(eps.get(group, []))
+        return index["groups"].get(group, ())
+
+
+# Subpackage names per `__path__` entry, keyed by the entry's mtime.
+_PATH_ENTRY_LISTINGS: Dict[str, Tuple[Optional[int], Tuple[str, ...]]] = {}
+
+
+def _path_entry_stamp(path_entry: str) -> Optional[int]:
+    """Modification time of a path entry, or of the archive containing it."""
+    path = path_entry
+    while True:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            # Entries inside a zip archive ("app.pyz/pkg/plugins") are not
+            # stat-able themselves; the archive's mtime stands in for them.
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+
+def _list_path_entry(path_entry: str) -> Tuple[str, ...]:
+    """
+    Return the subpackage names found in one package `__path__` entry.
+
+    Plain directories are listed with one `os.scandir`; anything else
+    (zip archives, custom path hooks) goes through `pkgutil.iter_modules`
+    and the finder registered for the entry. Listings are cached until the
+    entry's mtime changes.
+    """
+    stamp = _path_entry_stamp(path_entry)
+    cached = _PATH_ENTRY_LISTINGS.get(path_entry)
+    if stamp is not None and cached is not None and cached[0] == stamp:
+        return cached[1]
+    if os.path.isdir(path_entry):
+        names = tuple(
+            entry.name for entry in os.scandir(path_entry)
+            if entry.is_dir() and entry.name != "__pycache__" and entry.name.isidentifier()
+        )
+    else:
+        names = tuple(name for _, name, ispkg in pkgutil.iter_modules([path_entry]) if ispkg)
+    if stamp is not None:
+        _PATH_ENTRY_LISTINGS[path_entry] = (stamp, names)
+    return names
+
+
+def clear_entry_point_index():
+    """Drop the shared entry point index; the next lookup rebuilds it."""
+    with _ENTRY_POINT_LOCK:
+        _ENTRY_POINT_INDEX.update(fingerprint=None, groups={}, complete=False)
+
+
+# Number of import probes running; tracemalloc is started by the first and
+# stopped by the last, unless it was already tracing.
+_TRACEMALLOC_STATE = {"probes": 0, "owned": False}
+_TRACEMALLOC_LOCK = threading.Lock()
+
+
+class _ImportProbe:
+    """Measures one plugin import: wall time, traced memory and new modules."""
+
+    __slots__ = ("started", "memory_before", "modules_before", "result")
+
+    def __init__(self):
+        with _TRACEMALLOC_LOCK:
+            if _TRACEMALLOC_STATE["probes"] == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _TRACEMALLOC_STATE["owned"] = True
+            _TRACEMALLOC_STATE["probes"] += 1
+        self.modules_before = set(sys.modules)
+        self.memory_before = tracemalloc.get_traced_memory()[0]
+        self.result: Optional[Dict[str, Any]] = None
+        self.started = time.perf_counter()
+
+    def stop(self) -> Dict[str, Any]:
+        if self.result is not None:
+            return self.result
+        duration = time.perf_counter() - self.started
+        memory_delta = tracemalloc.get_traced_memory()[0] - self.memory_before
+        new_modules = sorted(name for name in list(sys.modules) if name not in self.modules_before)
+        with _TRACEMALLOC_LOCK:
+            _TRACEMALLOC_STATE["probes"] -= 1
+            if _TRACEMALLOC_STATE["probes"] == 0 and _TRACEMALLOC_STATE["owned"]:
+                tracemalloc.stop()
+                _TRACEMALLOC_STATE["owned"] = False
+        self.result = {"duration": duration, "memory_delta": memory_delta, "new_modules": new_modules}
+        return self.result
+
+
+class _PluginEntry:
+    """Discovery record for one plugin: where it lives and, once known, its key."""
+
+    __slots__ = ("name", "target", "identity", "state", "lock", "failure", "mtime", "source", "location",
+                 "profile")
+
+    def __init__(self, name: str, target: Any, identity: Optional[str] = None, mtime: Optional[int] = None,
+                 source: Optional[str] = None, location: Optional[str] = None):
+        self.name = name
+        # Directory holding the plugin package, when it lives in one.
+        self.location = location
+        self.target = target
+        self.source = source or ("filesystem" if isinstance(target, str) else "entry_points")
+        self.identity = identity
+        self.mtime = mtime
+        self.state = "pending"
+        self.lock = threading.RLock()
+        self.failure: Optional[Dict[str, Any]] = None
+        self.profile: Optional[Dict[str, Any]] = None
+
+
+class PluginProxy:
+    """
+    Stand-in for a plugin returned by `LazyRegistry(value_mode="proxy")`.
+
+    The identity attribute (`attr_name`), `__name__` and
+    `__depdigest_plugin__` are answered from discovery. Any other attribute
+    imports the plugin first; if its mapped library is missing, the
+    configured DepDigest exception is raised, as with `check_dependency`.
+    """
+
+    __slots__ = ("_registry", "_entry", "_value")
+
+    def __init__(self, registry: "LazyRegistry", entry: _PluginEntry):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_entry", entry)
+        object.__setattr__(self, "_value", LazyRegistry._MISSING)
+
+    def _load(self) -> Any:
+        value = self._value
+        if value is LazyRegistry._MISSING:
+            value = self._registry._load_proxied(self._entry)
+            object.__setattr__(self, "_value", value)
+        elif self._registry._access is not None:
+            self._registry._touch(self._entry.identity)
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        entry = self._entry
+        if name == self._registry._attr_name and entry.identity:
+            return entry.identity
+        if name == "__name__":
+            target = entry.target
+            return target if entry.source == "filesystem" else target.value.split(":")[0]
+        if name == "__depdigest_plugin__":
+            return self._registry._plugin_metadata(entry)
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        if self._value is LazyRegistry._MISSING:
+            return f"<PluginProxy {self._entry.identity!r} (not loaded)>"
+        return f"<PluginProxy {self._entry.identity!r} of {self._value!r}>"
+
+
+class WarmUp:
+    """
+    Handle for a `LazyRegistry.warm_up` run.
+
+    `progress()` reports state, counts and per-plugin import timings;
+    `cancel()` stops the run after the import in progress.
+    """
+
+    def __init__(self, registry: "LazyRegistry", keys: Optional[List[str]]):
+        self._registry = registry
+        self._keys = keys
+        self._total: Optional[int] = None
+        self._timings: Dict[str, float] = {}
+        self._failed: List[str] = []
+        self._started: Optional[float] = None
+        self._ended: Optional[float] = None
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _targets(self) -> List[Any]:
+        registry = self._registry
+        registry._ensure_discovered()
+        if self._keys is not None:
+            return [(key, lambda key=key: registry._load_key(key) is not registry._MISSING) for key in self._keys]
+        return [
+            (entry.name, lambda entry=entry: registry._load_entry(entry) is not None)
+            for entry in list(registry._manifest.values())
+        ]
+
+    def _run(self):
+        self._started = time.perf_counter()
+        try:
+            targets = self._targets()
+            self._total = len(targets)
+            for label, load in targets:
+                if self._cancelled.is_set():
+                    break
+                start = time.perf_counter()
+                if not load():
+                    self._failed.append(label)
+                self._timings[label] = time.perf_counter() - start
+            if self._keys is None and not self._cancelled.is_set():
+                self._registry._ensure_initialized()
+        except Exception as e:
+            logger.warning("LazyRegistry warm-up for %s failed: %s", self._registry._package_prefix, e)
+        finally:
+            self._ended = time.perf_counter()
+            self._finished.set()
+            logger.debug(
+                "LazyRegistry warm-up for %s finished: %d/%s plugins in %.3fs",
+                self._registry._package_prefix, len(self._timings), self._total, self._ended - self._started,
+            )
+
+    def cancel(self):
+        """Stop after the plugin currently being imported."""
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the run ends. Returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def progress(self) -> Dict[str, Any]:
+        if self._finished.is_set():
+            state = "cancelled" if self._cancelled.is_set() and len(self._timings) < (self._total or 0) else "done"
+        else:
+            state = "running" if self._started is not None else "pending"
+        elapsed = None
+        if self._started is not None:
+            elapsed = (self._ended or time.perf_counter()) - self._started
+        return {
+            "state": state,
+            "total": self._total,
+            "completed": len(self._timings),
+            "failed": list(self._failed),
+            "elapsed": elapsed,
+            "timings": dict(self._timings),
+        }
+
+
 class LazyRegistry(dict):
     """
     A dictionary-like registry that populates itself lazily.
+
+    Discovery builds a manifest of plugin locations without importing them.
+    `registry[key]` and `get` import only the plugin providing `key`;
+    `values()` and `items()` import every plugin. `keys()`, `in` and `len`
+    answer from the manifest, importing only plugins whose key cannot be
+    known without importing them.
+
+    With `static_identity=True`, filesystem discovery reads a literal
+    `attr_name` assignment from each plugin's `__init__.py` without
+    executing it, and entry point discovery takes entry point names as
+    keys, so the key space is known before any import. Entry points are
+    looked up in an index shared by all registries (see
+    `clear_entry_point_index`).
+
+    With `manifest_cache=True`, the discovered manifest is persisted under
+    `cache_dir` (default: `depdigest.core.cache.user_cache_dir()`) and reused
+    while the plugin directory mtime, or for entry points the environment
+    fingerprint, is unchanged.
+
+    The registry is thread-safe: discovery, full initialization and each
+    plugin import run exactly once, and concurrent callers block until the
+    part they need is ready. Lookups of already loaded keys take no lock.
+
+    With `max_workers` greater than 1, a full load (`values()`, `items()`)
+    imports plugins concurrently on a bounded thread pool; registry order
+    stays the discovery order.
+
+    `discovery_mode="package"` ignores `directory` and lists the
+    subpackages of `package_prefix` through its `__path__`, so plugins are
+    found in zip archives and namespace packages split across several path
+    entries.
+
+    `discovery_mode="hybrid"` merges plugin subpackages of `directory` and
+    entry points of `entrypoint_group` into one manifest; `precedence`
+    names the source that wins when both provide the same plugin name or
+    key.
+
+    `warm_up()` loads plugins ahead of use, optionally in a background
+    thread; see `WarmUp`.
+
+    With `value_mode="proxy"` (which requires `static_identity=True`),
+    lookups return `PluginProxy` objects that import the plugin on first use
+    of a non-identity attribute. Plugins whose key still needs an import are
+    skipped without importing, and recorded as failed, when their mapped
+    library is unavailable.
+
+    `max_loaded` (LRU size) and `idle_ttl` (seconds) bound how many plugins
+    stay referenced; evicted plugins reload on demand. With
+    `evict_modules=True`, an evicted plugin's own modules are also removed
+    from `sys.modules`. `diagnostics()` exposes hit, miss and eviction
+    counters.
+
+    Failed imports are recorded (see `failures()`) and, by default, never
+    retried. `retry_failed` may instead be a number of seconds after which
+    a failed plugin is tried again, or "fingerprint" to retry once the
+    environment fingerprint changes. Retries happen on lookups and membership
+    tests that miss, on `keys()`, and on full loads.
+
+    With `profile_imports=True`, each plugin import is measured (wall time,
+    tracemalloc delta, new `sys.modules` entries); see `import_profile()`.
     """
+    _MISSING = object()
+
     def __init__(self, 
                  package_prefix: str, 
                  directory: str, 
                  attr_name: str = 'form_name',
                  discovery_mode: str = "filesystem",
-                 entrypoint_group: Optional[str] = None):
+                 entrypoint_group: Optional[str] = None,
+                 static_identity: bool = False,
+                 manifest_cache: bool = False,
+                 cache_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 value_mode: str = "module",
+                 max_loaded: Optional[int] = None,
+                 idle_ttl: Optional[float] = None,
+                 evict_modules: bool = False,
+                 retry_failed: Any = "never",
+                 precedence: str = "filesystem",
+                 profile_imports: bool = False):
         super().__init__()
-        if discovery_mode not in {"filesystem", "entry_points"}:
-            raise ValueError("discovery_mode must be 'filesystem' or 'entry_points'")
-        if discovery_mode == "entry_points" and not entrypoint_group:
-            raise ValueError("entrypoint_group is required when discovery_mode='entry_points'")
+        if retry_failed not in ("never", "fingerprint") and not (
+            isinstance(retry_failed, (int, float)) and not isinstance(retry_failed, bool) and retry_failed > 0
+        ):
+            raise ValueError("retry_failed must be 'never', 'fingerprint' or a positive number of seconds")
+        if max_loaded is not None and (not isinstance(max_loaded, int) or max_loaded < 1):
+            raise ValueError("max_loaded must be a positive integer or None")
+        if idle_ttl is not None and idle_ttl <= 0:
+            raise ValueError("idle_ttl must be a positive number of seconds or None")
+        if value_mode not in {"module", "proxy"}:
+            raise ValueError("value_mode must be 'module' or 'proxy'")
+        if value_mode == "proxy" and not static_identity:
+            # Without it, every key is learned by importing its plugin.
+            raise ValueError("value_mode='proxy' requires static_identity=True")
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("max_workers must be a positive integer or None")
+        if discovery_mode not in {"filesystem", "entry_points", "hybrid", "package"}:
+            raise ValueError("discovery_mode must be 'filesystem', 'entry_points', 'hybrid' or 'package'")
+        if discovery_mode in {"entry_points", "hybrid"} and not entrypoint_group:
+            raise ValueError(f"entrypoint_group is required when discovery_mode='{discovery_mode}'")
+        if precedence not in {"filesystem", "entry_points"}:
+            raise ValueError("precedence must be 'filesystem' or 'entry_points'")
         self._package_prefix = package_prefix
         self._directory = directory
         self._attr_name = attr_name
         self._discovery_mode = discovery_mode
         self._entrypoint_group = entrypoint_group
+        self._precedence = precedence
+        self._static_identity = static_identity
+        self._manifest_cache = manifest_cache
+        self._manifest_cache_status: Optional[str] = None
+        self._cache_dir = cache_dir
+        self._max_workers = max_workers
+        self._value_mode = value_mode
+        self._proxies: Dict[str, PluginProxy] = {}
+        self._max_loaded = max_loaded
+        self._idle_ttl = idle_ttl
+        self._evict_modules = evict_modules
+        # Last access time per loaded key, oldest first; only kept when an
+        # eviction policy is set.
+        self._access: Optional["OrderedDict[str, float]"] = (
+            OrderedDict() if max_loaded is not None or idle_ttl is not None else None
+        )
+        self._retry_failed = retry_failed
+        self._profile_imports = profile_imports
+        self._scan_fingerprint: Optional[str] = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._manifest: Optional[Dict[str, _PluginEntry]] = None
+        self._identities: Dict[str, _PluginEntry] = {}
+        self._identities_resolved = False
         self._initialized = False
         self._initializing = False
+        # Lock order: init -> discovery -> plugin entry -> state. The state
+        # lock only guards short updates of the identity map and the stored
+        # values, and is never held while importing.
+        self._init_lock = threading.RLock()
+        self._discovery_lock = threading.RLock()
+        self._state_lock = threading.RLock()
+        self._local = threading.local()
+        self._warm_up: Optional[WarmUp] = None
+
+    def _ensure_discovered(self):
+        if self._manifest is not None:
+            return
+        with self._discovery_lock:
+            if self._manifest is not None:
+                return
+            manifest = self._discover()
+            with self._state_lock:
+                for entry in manifest.values():
+                    if entry.identity:
+                        self._identities.setdefault(entry.identity, entry)
+            self._manifest = manifest
 
     def _ensure_initialized(self):
-        if self._initialized or self._initializing:
+        # A due retry clears `_initialized`, so full loads pick it up.
+        self._revive_failed()
+        if self._initialized:
             return
-        self._initializing = True
+        with self._init_lock:
+            # `_initializing` is only seen here by the initializing thread
+            # itself, when a plugin import re-enters the registry.
+            if self._initialized or self._initializing:
+                return
+            if getattr(self._local, "parallel_load", False):
+                # A pool worker re-entering while the full load waits on it.
+                return
+            self._initializing = True
+            try:
+                self._scan_and_load()
+                self._initialized = True
+            finally:
+                self._initializing = False
+
+    @signal(tags=["loader"])
+    def _discover(self) -> Dict[str, _PluginEntry]:
+        if self._discovery_mode != "filesystem":
+            # Baseline for `refresh()`: the distribution set at discovery time.
+            self._scan_fingerprint = environment_fingerprint()
+        entries = fingerprint = None
+        if self._manifest_cache:
+            fingerprint = self._manifest_fingerprint()
+            if fingerprint is not None:
+                entries = self._read_manifest_cache(fingerprint)
+            self._manifest_cache_status = "hit" if entries is not None else "miss"
+        if entries is None:
+            entries = self._scan_locations()
+            if self._manifest_cache and fingerprint is not None:
+                self._write_manifest_cache(fingerprint, entries)
+
+        return self._visible(entries)
+
+    def _visible(self, entries: List[_PluginEntry]) -> Dict[str, _PluginEntry]:
+        manifest: Dict[str, _PluginEntry] = {}
+        if not entries:
+            return manifest
+        cfg = resolve_config(self._package_prefix)
+        for entry in entries:
+            if self._plugin_allowed(entry.name, cfg):
+                manifest[entry.name] = entry
+        return manifest
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """
+        Pick up plugins installed or removed since discovery.
+
+        Filesystem mode rescans the plugin directory and compares entries
+        and `__init__.py` mtimes; entry point mode rescans only when the
+        environment fingerprint changed. Removed plugins are dropped,
+        added ones are imported only if the registry was fully loaded
+        (otherwise on demand), and changed plugins that are not loaded yet
+        are rediscovered. Loaded plugins are left untouched.
+
+        Returns the plugin names that were `added`, `removed` and `changed`.
+        """
+        report: Dict[str, List[str]] = {"added": [], "removed": [], "changed": []}
+        with self._init_lock, self._discovery_lock:
+            if self._manifest is None:
+                self._ensure_discovered()
+                report["added"] = list(self._manifest)
+                return report
+            if self._discovery_mode == "entry_points":
+                fingerprint = environment_fingerprint()
+                if fingerprint == self._scan_fingerprint:
+                    return report
+                self._scan_fingerprint = fingerprint
+            scanned = self._scan_locations()
+            if self._manifest_cache:
+                cache_fingerprint = self._manifest_fingerprint()
+                if cache_fingerprint is not None:
+                    self._write_manifest_cache(cache_fingerprint, scanned)
+
+            old = self._manifest
+            fresh = self._visible(scanned)
+            manifest: Dict[str, _PluginEntry] = {}
+            added: List[_PluginEntry] = []
+            with self._state_lock:
+                for name, entry in fresh.items():
+                    current = old.get(name)
+                    if current is None:
+                        report["added"].append(name)
+                        added.append(entry)
+                    elif current.state != "loaded" and self._source_changed(current, entry):
+                        report["changed"].append(name)
+                        self._forget_identity(current)
+                        added.append(entry)
+                    else:
+                        manifest[name] = current
+                        continue
+                    manifest[name] = entry
+                    if entry.identity:
+                        self._identities.setdefault(entry.identity, entry)
+                for name, entry in old.items():
+                    if name not in fresh:
+                        report["removed"].append(name)
+                        self._drop_entry(entry)
+                if added:
+                    self._identities_resolved = False
+                self._manifest = manifest
+            if added and self._initialized:
+                for entry in added:
+                    self._load_entry(entry)
+                self._reorder_loaded()
+            self._reorder_identities()
+        return report
+
+    def _source_changed(self, current: _PluginEntry, scanned: _PluginEntry) -> bool:
+        if current.source != scanned.source:
+            return True
+        if current.source == "filesystem":
+            return current.mtime != scanned.mtime or current.identity != scanned.identity
+        return current.target.value != scanned.target.value
+
+    def _drop_entry(self, entry: _PluginEntry):
+        """Remove a plugin that no longer exists. Called with the state lock held."""
+        self._forget_identity(entry)
+        if entry.state == "loaded" and entry.identity:
+            super().pop(entry.identity, None)
+            self._proxies.pop(entry.identity, None)
+            if self._access is not None:
+                self._access.pop(entry.identity, None)
+        entry.state = "removed"
+
+    def _scan_locations(self) -> List[_PluginEntry]:
+        """List every plugin location, before visibility filtering."""
+        if self._discovery_mode == "filesystem":
+            return self._scan_directory()
+        if self._discovery_mode == "entry_points":
+            return self._scan_entry_points()
+        if self._discovery_mode == "package":
+            return self._scan_package()
+        # Hybrid: the preferred source is listed first and wins name clashes.
+        directory, eps = self._scan_directory(), self._scan_entry_points()
+        first, second = (directory, eps) if self._precedence == "filesystem" else (eps, directory)
+        names = {entry.name for entry in first}
+        return first + [entry for entry in second if entry.name not in names]
+
+    def _scan_directory(self) -> List[_PluginEntry]:
+        entries: List[_PluginEntry] = []
+        if not os.path.exists(self._directory):
+            return entries
+        for entry in os.scandir(self._directory):
+            if entry.is_dir() and entry.name not in ['__pycache__']:
+                entries.append(self._directory_entry(entry.name, self._directory))
+        return entries
+
+    def _directory_entry(self, plugin_name: str, location: Optional[str]) -> _PluginEntry:
+        identity = self._static_identity_of(plugin_name, location) if self._static_identity else None
+        return _PluginEntry(
+            plugin_name,
+            f"{self._package_prefix}.{plugin_name}",
+            identity,
+            self._init_mtime(plugin_name, location),
+            location=location,
+        )
+
+    def _package_path(self) -> List[str]:
+        package = import_module(self._package_prefix)
+        return [entry for entry in getattr(package, "__path__", []) if isinstance(entry, str)]
+
+    def _scan_package(self) -> List[_PluginEntry]:
+        """List subpackages of `package_prefix` through its `__path__` entries."""
+        entries: Dict[str, _PluginEntry] = {}
+        for path_entry in self._package_path():
+            location = path_entry if os.path.isdir(path_entry) else None
+            for name in _list_path_entry(path_entry):
+                # Like the import system, the first path entry wins.
+                if name not in entries:
+                    entries[name] = self._directory_entry(name, location)
+        return list(entries.values())
+
+    def _scan_entry_points(self) -> List[_PluginEntry]:
+        return [
+            _PluginEntry(ep.name, ep, ep.name if self._static_identity else None)
+            for ep in self._resolve_entry_points()
+        ]
+
+    def _rank(self, entry: _PluginEntry) -> int:
+        """Lower ranks win key conflicts; only hybrid discovery ranks sources."""
+        if self._discovery_mode != "hybrid":
+            return 0
+        return 0 if entry.source == self._precedence else 1
+
+    def _manifest_cache_file(self) -> str:
+        registry_id = json.dumps([
+            self._package_prefix,
+            self._discovery_mode,
+            os.path.abspath(self._directory) if self._discovery_mode != "entry_points" else None,
+            self._entrypoint_group,
+            self._precedence,
+            self._attr_name,
+            self._static_identity,
+        ])
+        digest = hashlib.sha256(registry_id.encode("utf-8")).hexdigest()[:16]
+        return cache_file_path(f"manifest-{digest}", self._cache_dir)
+
+    def _manifest_fingerprint(self) -> Optional[str]:
+        """Plugin directory mtime and/or the environment fingerprint for entry points."""
+        if self._discovery_mode == "package":
+            stamps = [_path_entry_stamp(path_entry) for path_entry in self._package_path()]
+            return None if None in stamps else json.dumps(stamps)
+        environment = None
+        if self._discovery_mode != "filesystem":
+            environment = self._scan_fingerprint or environment_fingerprint()
+            if self._discovery_mode == "entry_points":
+                return environment
         try:
-            self._scan_and_load()
-            self._initialized = True
-        finally:
-            self._initializing = False
+            directory = str(os.stat(self._directory).st_mtime_ns)
+        except OSError:
+            if environment is None:
+                return None
+            directory = "missing"
+        return directory if environment is None else f"{directory}:{environment}"
+
+    def _init_mtime(self, plugin_name: str, location: Optional[str]) -> Optional[int]:
+        if location is None:
+            return None
+        try:
+            return os.stat(os.path.join(location, plugin_name, "__init__.py")).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_manifest_cache(self, fingerprint: str) -> Optional[List[_PluginEntry]]:
+        data = _read_cache_file(self._manifest_cache_file(), fingerprint)
+        if data is None:
+            return None
+        entries = []
+        try:
+            for record in data["entries"]:
+                source = record.get("source", "filesystem" if self._discovery_mode == "filesystem" else "entry_points")
+                location = record.get("location")
+                if source == "filesystem":
+                    # Statically read identities go stale when `__init__.py` changes
+                    # without touching the directory itself.
+                    if (
+                        record["identity"] is not None
+                        and location is not None
+                        and record["mtime"] != self._init_mtime(record["name"], location)
+                    ):
+                        return None
+                    target = record["target"]
+                else:
+                    target = EntryPoint(record["name"], record["target"], self._entrypoint_group)
+                entries.append(
+                    _PluginEntry(record["name"], target, record["identity"], record["mtime"], source, location)
+                )
+        except (KeyError, TypeError):
+            return None
+        return entries
+
+    def _write_manifest_cache(self, fingerprint: str, entries: List[_PluginEntry]):
+        records = []
+        for entry in entries:
+            if entry.source == "filesystem":
+                target = entry.target
+                mtime = entry.mtime
+            else:
+                target = entry.target.value
+                mtime = None
+            records.append({
+                "name": entry.name,
+                "source": entry.source,
+                "target": target,
+                "identity": entry.identity,
+                "mtime": mtime,
+                "location": entry.location,
+            })
+        _write_cache_file(self._manifest_cache_file(), fingerprint, {"entries": records})
+
+    def _proxy(self, key) -> PluginProxy:
+        proxy = self._proxies.get(key)
+        if proxy is None:
+            self._ensure_discovered()
+            entry = self._identities.get(key)
+            if entry is None:
+                # Only an import can tell which plugin provides this key.
+                if self._load_key(key) is self._MISSING:
+                    raise KeyError(key)
+                entry = self._identities[key]
+            with self._state_lock:
+                proxy = self._proxies.setdefault(key, PluginProxy(self, entry))
+        if proxy._entry.state == "loaded":
+            self._hits += 1
+            if self._access is not None:
+                self._touch(key)
+        else:
+            self._misses += 1
+        return proxy
+
+    def _plugin_metadata(self, entry: _PluginEntry) -> Dict[str, Any]:
+        target = entry.target
+        return {
+            "plugin": entry.name,
+            "identity": entry.identity,
+            "target": target if entry.source == "filesystem" else target.value,
+            "source": entry.source,
+            "library": resolve_config(self._package_prefix).mapping.get(entry.name),
+            "state": entry.state,
+        }
+
+    def _check_mapped_dependency(self, entry: _PluginEntry, caller: str):
+        """Raise the configured exception if the plugin's mapped library is unavailable."""
+        cfg = resolve_config(self._package_prefix)
+        library = cfg.mapping.get(entry.name)
+        if library:
+            lib_info = cfg.libraries.get(library, {})
+            check_dependency(
+                library,
+                pypi_name=lib_info.get("pypi"),
+                caller=caller,
+                exception_class=cfg.exception_class,
+                version=lib_info.get("version"),
+            )
+
+    def _load_proxied(self, entry: _PluginEntry) -> Any:
+        """Check the plugin's mapped library, then import it for a proxy."""
+        self._check_mapped_dependency(entry, f"{self._package_prefix}[{entry.identity!r}]")
+        _, value = self._load_value(entry)
+        if value is self._MISSING:
+            reason = ""
+            if entry.failure is not None:
+                reason = f": {entry.failure['exception_type']}: {entry.failure['message']}"
+            raise ImportError(f"Plugin {entry.name!r} of {self._package_prefix} failed to load{reason}")
+        if self._access is not None:
+            self.evict()
+        return value
+
+    def warm_up(self, keys: Optional[Iterable[str]] = None, background: bool = True) -> WarmUp:
+        """
+        Load plugins ahead of use and return a `WarmUp` handle.
+
+        With `keys`, only the plugins providing those keys are loaded, in
+        the given order; otherwise every plugin is. Foreground lookups do
+        not wait for the warm-up, only for the plugin they need if it is
+        being imported at that moment. With `background=False` the run
+        happens in the calling thread.
+        """
+        handle = WarmUp(self, list(keys) if keys is not None else None)
+        self._warm_up = handle
+        if background:
+            handle._thread = threading.Thread(
+                target=handle._run, name="depdigest-warm-up", daemon=True
+            )
+            handle._thread.start()
+        else:
+            handle._run()
+        return handle
+
+    def diagnostics(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of discovery and loading state.
+
+        `manifest_cache` is "hit" or "miss" once discovery ran with the
+        cache enabled, "disabled" otherwise, and None before discovery.
+        """
+        manifest = self._manifest or {}
+        return {
+            "discovery_mode": self._discovery_mode,
+            "discovered": self._manifest is not None,
+            "manifest_cache": self._manifest_cache_status if self._manifest_cache else "disabled",
+            "plugins": len(manifest),
+            "loaded": sorted(entry.name for entry in manifest.values() if entry.state == "loaded"),
+            "failed": sorted(entry.name for entry in manifest.values() if entry.state == "failed"),
+            "shadowed": sorted(entry.name for entry in manifest.values() if entry.state == "shadowed"),
+            "warm_up": self._warm_up.progress() if self._warm_up is not None else None,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+
+    def _static_identity_of(self, plugin_name: str, location: Optional[str]) -> Optional[str]:
+        if location is None:
+            return None
+        init_path = os.path.join(location, plugin_name, "__init__.py")
+        identity = extract_literal_assignment(init_path, self._attr_name)
+        # Anything but a non-empty string literal is resolved by importing.
+        return identity if isinstance(identity, str) and identity else None
 
     @signal(tags=["loader"])
     def _scan_and_load(self):
-        if self._discovery_mode == "filesystem":
-            if not os.path.exists(self._directory):
-                return
-            cfg = resolve_config(self._package_prefix)
-            for entry in os.scandir(self._directory):
-                if entry.is_dir() and entry.name not in ['__pycache__']:
-                    if not self._plugin_allowed(entry.name, cfg):
-                        continue
+        self._ensure_discovered()
+        self._revive_failed()
+        pending = [entry for entry in self._manifest.values() if entry.state != "loaded"]
+        if self._max_workers and self._max_workers > 1 and len(pending) > 1:
+            workers = min(self._max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="depdigest-loader") as pool:
+                list(pool.map(self._load_entry_in_worker, pending))
+        else:
+            for entry in pending:
+                self._load_entry(entry)
+        self._reorder_loaded()
+
+    def _load_entry_in_worker(self, entry: _PluginEntry) -> Optional[str]:
+        self._local.parallel_load = True
+        try:
+            return self._load_entry(entry)
+        finally:
+            self._local.parallel_load = False
+
+    def _reorder_loaded(self):
+        """Keep registry order deterministic: discovery order, not access order."""
+        with self._state_lock:
+            loaded = [
+                (entry.identity, super(LazyRegistry, self).__getitem__(entry.identity))
+                for entry in self._manifest.values()
+                if entry.state == "loaded" and super(LazyRegistry, self).__contains__(entry.identity)
+            ]
+            # Lock-free readers missing a key during the swap fall back to
+            # `_load_key`, which waits on this lock.
+            super().clear()
+            super().update(loaded)
+
+    def _load_entry(self, entry: _PluginEntry) -> Optional[str]:
+        """Import one plugin and store it under its identity. Returns the identity."""
+        if entry.state == "loaded":
+            return entry.identity
+        return self._load_value(entry)[0]
+
+    def _load_value(self, entry: _PluginEntry) -> Tuple[Optional[str], Any]:
+        """
+        Return a plugin's identity and value, importing it if needed.
+
+        The value is returned directly rather than read back from the
+        registry, where another thread may already have evicted it. Returns
+        `(None, _MISSING)` if the plugin failed, is shadowed, or is being
+        imported by the calling thread.
+        """
+        while True:
+            with self._state_lock:
+                if entry.state == "loaded":
+                    return entry.identity, super().__getitem__(entry.identity)
+            with entry.lock:
+                # Another thread's import has finished once the lock is ours;
+                # a re-entrant call from the importing thread sees "loading".
+                if entry.state == "pending":
+                    if self._value_mode == "proxy" and entry.identity is None and not self._identity_import_allowed(entry):
+                        return None, self._MISSING
+                    entry.state = "loading"
+                    probe = _ImportProbe() if self._profile_imports else None
                     try:
-                        module_path = f"{self._package_prefix}.{entry.name}"
-                        mod = import_module(module_path)
-                        identity = getattr(mod, self._attr_name, None)
-                        if identity:
-                            self[identity] = mod
-                    except Exception as e:
-                        self._emit_plugin_load_failed(entry.name, e)
+                        return self._import_entry(entry, probe)
+                    finally:
+                        if probe is not None:
+                            self._record_profile(entry, probe.stop())
+                if entry.state != "loaded":
+                    return None, self._MISSING
+
+    def _identity_import_allowed(self, entry: _PluginEntry) -> bool:
+        """
+        Gate the import that learns a proxy-mode plugin's key.
+
+        Proxies check a plugin's mapped library before importing it, but a
+        plugin without a static key must be imported to get a proxy at all;
+        if its library is unavailable it is recorded as failed instead.
+        """
+        started = time.perf_counter()
+        try:
+            self._check_mapped_dependency(entry, f"{self._package_prefix}.{entry.name}")
+        except Exception as e:
+            self._record_failure(entry, type(e).__name__, str(e), started)
+            return False
+        return True
+
+    def _import_entry(self, entry: _PluginEntry, probe: Optional[_ImportProbe]) -> Tuple[Optional[str], Any]:
+        started = time.perf_counter()
+        try:
+            if entry.source == "filesystem":
+                value = import_module(entry.target)
+                identity = getattr(value, self._attr_name, None)
+            else:
+                value = entry.target.load()
+                identity = getattr(value, self._attr_name, None) or entry.name
+        except Exception as e:
+            if probe is not None:
+                probe.stop()
+            self._record_failure(entry, type(e).__name__, str(e), started)
+            self._emit_plugin_load_failed(entry.name, e)
+            return None, self._MISSING
+        if probe is not None:
+            probe.stop()
+
+        if not identity:
+            message = f"plugin does not define {self._attr_name!r}"
+            self._record_failure(entry, "AttributeError", message, started)
+            return None, self._MISSING
+        with self._state_lock:
+            if entry.identity != identity:
+                self._forget_identity(entry)
+                entry.identity = identity
+            owner = self._identities.get(identity)
+            if owner is not None and owner is not entry:
+                if self._rank(entry) >= self._rank(owner):
+                    entry.state = "shadowed"
+                    return None, self._MISSING
+                # This plugin's source takes precedence for the key.
+                owner.state = "shadowed"
+                self._proxies.pop(identity, None)
+            self._identities[identity] = entry
+            self[identity] = value
+            entry.failure = None
+            entry.state = "loaded"
+            if self._access is not None:
+                self._touch(identity)
+        return identity, value
+
+    def _record_failure(self, entry: _PluginEntry, exception_type: str, message: str, started: float):
+        failure = {
+            "plugin": entry.name,
+            "exception_type": exception_type,
+            "message": message,
+            "duration": time.perf_counter() - started,
+            "timestamp": time.time(),
+            "fingerprint": environment_fingerprint() if self._retry_failed == "fingerprint" else None,
+        }
+        with self._state_lock:
+            entry.failure = failure
+            entry.state = "failed"
+            self._forget_identity(entry)
+
+    def _record_profile(self, entry: _PluginEntry, measurement: Dict[str, Any]):
+        profile = {
+            "plugin": entry.name,
+            "identity": entry.identity,
+            "source": entry.source,
+            "state": entry.state,
+            "duration": measurement["duration"],
+            "memory_delta": measurement["memory_delta"],
+            "new_modules": list(measurement["new_modules"]),
+            "timestamp": time.time(),
+        }
+        entry.profile = profile
+        self._emit_import_profile(profile)
+
+    def _revive_failed(self):
+        """Return failed plugins whose retry is due to the pending state."""
+        if self._retry_failed == "never" or self._manifest is None:
+            return
+        failed = [entry for entry in self._manifest.values() if entry.state == "failed" and entry.failure]
+        if not failed:
             return
+        if self._retry_failed == "fingerprint":
+            fingerprint = environment_fingerprint()
+            due = [entry for entry in failed if entry.failure["fingerprint"] != fingerprint]
+        else:
+            now = time.time()
+            due = [entry for entry in failed if now - entry.failure["timestamp"] >= self._retry_failed]
+        with self._state_lock:
+            for entry in due:
+                if entry.state == "failed":
+                    entry.state = "pending"
+                    if entry.identity:
+                        self._identities.setdefault(entry.identity, entry)
+                    self._identities_resolved = False
+                    self._initialized = False
 
-        cfg = resolve_config(self._package_prefix)
-        for ep in self._resolve_entry_points():
-            if not self._plugin_allowed(ep.name, cfg):
-                continue
+    def failures(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the recorded failure of each plugin that failed to load.
+
+        Keys are plugin names (directory or entry point names). Each record
+        holds `exception_type`, `message`, `duration` (seconds spent in the
+        failed import), `timestamp` (epoch seconds) and `fingerprint` (the
+        environment fingerprint when `retry_failed="fingerprint"`).
+        """
+        manifest = self._manifest or {}
+        return {
+            entry.name: dict(entry.failure)
+            for entry in manifest.values()
+            if entry.state == "failed" and entry.failure is not None
+        }
+
+    def import_profile(self) -> Dict[str, Any]:
+        """
+        Return per-plugin import measurements recorded with `profile_imports=True`.
+
+        `plugins` maps plugin names, in discovery order, to the last import
+        of each plugin: `identity`, `source`, `state` after the import,
+        `duration` (seconds), `memory_delta` (bytes traced by tracemalloc),
+        `new_modules` (names the import added to `sys.modules`) and
+        `timestamp`. Imports running concurrently, or nested through another
+        plugin, are counted in each measurement that overlaps them.
+        `slowest` lists plugin names by decreasing duration.
+        """
+        manifest = self._manifest or {}
+        plugins = {entry.name: dict(entry.profile) for entry in manifest.values() if entry.profile is not None}
+        return {
+            "enabled": self._profile_imports,
+            "plugins": plugins,
+            "total_duration": sum(profile["duration"] for profile in plugins.values()),
+            "total_memory_delta": sum(profile["memory_delta"] for profile in plugins.values()),
+            "slowest": sorted(plugins, key=lambda name: plugins[name]["duration"], reverse=True),
+        }
+
+    def _forget_identity(self, entry: _PluginEntry):
+        if entry.identity and self._identities.get(entry.identity) is entry:
+            del self._identities[entry.identity]
+
+    def _unresolved_entries(self, preferred: Optional[str] = None) -> List[_PluginEntry]:
+        """Return plugins whose key is still unknown, `preferred` location first."""
+        entries = [
+            entry for entry in self._manifest.values()
+            if entry.identity is None and entry.state in ("pending", "loading")
+        ]
+        # Higher-precedence sources are exhausted first, so a key found in a
+        # lower-precedence source cannot be claimed later.
+        entries.sort(key=lambda entry: (self._rank(entry), entry.name != preferred))
+        return entries
+
+    def _resolve_identities(self):
+        if self._identities_resolved:
+            return
+        self._ensure_discovered()
+        for entry in self._unresolved_entries():
+            self._load_entry(entry)
+        # Entries still unresolved here are being imported by this thread.
+        if not self._unresolved_entries():
+            self._reorder_identities()
+            self._identities_resolved = True
+
+    def _reorder_identities(self):
+        """List keys in discovery order; the map is swapped, never mutated in place."""
+        with self._state_lock:
+            self._identities = {
+                entry.identity: entry
+                for entry in self._manifest.values()
+                if entry.identity and self._identities.get(entry.identity) is entry
+            }
+
+    def _load_key(self, key) -> Any:
+        """Load the plugin providing `key`. Returns its value or `_MISSING`."""
+        self._ensure_discovered()
+        self._revive_failed()
+        value = self._MISSING
+        entry = self._identities.get(key)
+        if entry is None:
+            # The key may belong to a plugin whose identity is only known
+            # after import; try the one named after the key first.
+            for candidate in self._unresolved_entries(preferred=key):
+                identity, candidate_value = self._load_value(candidate)
+                if identity == key:
+                    value = candidate_value
+                    break
+            else:
+                # Another thread may have resolved the key meanwhile.
+                entry = self._identities.get(key)
+        if entry is not None:
+            identity, entry_value = self._load_value(entry)
+            if identity == key:
+                value = entry_value
+        if self._access is not None:
+            self.evict()
+        return value
+
+    def _touch(self, key):
+        with self._state_lock:
+            # The key may have been evicted since the caller read it.
+            if super().__contains__(key):
+                self._access[key] = time.monotonic()
+                self._access.move_to_end(key)
+
+    def evict(self) -> int:
+        """
+        Apply the eviction policy now and return the number of evicted plugins.
+
+        Lookups that load a plugin run this automatically; long-running
+        processes can also call it periodically to release idle plugins.
+        """
+        if self._access is None:
+            return 0
+        with self._state_lock:
+            victims = []
+            if self._idle_ttl is not None:
+                now = time.monotonic()
+                victims = [key for key, last in self._access.items() if now - last > self._idle_ttl]
+            if self._max_loaded is not None:
+                excess = len(self._access) - len(victims) - self._max_loaded
+                for key in self._access:
+                    if excess <= 0:
+                        break
+                    if key not in victims:
+                        victims.append(key)
+                        excess -= 1
+            for key in victims:
+                self._evict_key(key)
+            return len(victims)
+
+    def _evict_key(self, key):
+        """Drop a loaded plugin. Called with the state lock held."""
+        self._access.pop(key, None)
+        value = super().pop(key, self._MISSING)
+        entry = self._identities.get(key)
+        if value is self._MISSING or entry is None:
+            return
+        entry.state = "pending"
+        self._initialized = False
+        self._evictions += 1
+        proxy = self._proxies.get(key)
+        if proxy is not None:
+            object.__setattr__(proxy, "_value", self._MISSING)
+        if self._evict_modules:
+            self._drop_modules(entry, value)
+
+    def _drop_modules(self, entry: _PluginEntry, value: Any):
+        """Remove the plugin's own modules from `sys.modules` if it owns them."""
+        target = entry.target
+        root = target if entry.source == "filesystem" else target.value.split(":")[0].strip()
+        # Only plugins whose registry value is their own module are dropped;
+        # shared dependencies are never touched.
+        if sys.modules.get(root) is not value:
+            return
+        for name in [name for name in sys.modules if name == root or name.startswith(root + ".")]:
+            sys.modules.pop(name, None)
+        parent_name, _, child = root.rpartition(".")
+        parent = sys.modules.get(parent_name) if parent_name else None
+        if parent is not None and getattr(parent, child, None) is value:
             try:
-                loaded = ep.load()
-                identity = getattr(loaded, self._attr_name, None) or ep.name
-                self[identity] = loaded
-            except Exception as e:
-                self._emit_plugin_load_failed(ep.name, e)
+                delattr(parent, child)
+            except AttributeError:
+                pass
 
     def _plugin_allowed(self, plugin_key: str, cfg) -> bool:
         lib_key = cfg.mapping.get(plugin_key)
@@ -82,10 +1197,7 @@ class LazyRegistry(dict):
         return True
 
     def _resolve_entry_points(self) -> Iterable[Any]:
-        eps = entry_points()
-        if hasattr(eps, "select"):
-            return eps.select(group=self._entrypoint_group)
-        return eps.get(self._entrypoint_group, [])
+        return _entry_points_for_group(self._entrypoint_group)
 
     def _emit_plugin_load_failed(self, plugin_name: str, error: Exception):
         from smonitor.integrations import emit_from_catalog, merge_extra
@@ -99,39 +1211,98 @@ class LazyRegistry(dict):
                     META,
                     {
                         "plugin": plugin_name,
-                        "caller": "depdigest.core.loader.LazyRegistry._scan_and_load",
+                        "caller": "depdigest.core.loader.LazyRegistry._load_entry",
                         "error": str(error),
                     },
                 ),
             )
         except Exception as emit_error:
             logger.warning(
-                "SMonitor emission failed in LazyRegistry._scan_and_load: signal=plugin_load_failed plugin=%s error=%s",
+                "SMonitor emission failed in LazyRegistry._load_entry: signal=plugin_load_failed plugin=%s error=%s",
                 plugin_name,
                 emit_error,
             )
         logger.debug(f"Failed to load plugin {plugin_name}: {error}")
 
+    def _emit_import_profile(self, profile: Dict[str, Any]):
+        from smonitor.integrations import emit_from_catalog, merge_extra
+        from .._private.smonitor.catalog import CATALOG, META, PACKAGE_ROOT
+
+        try:
+            emit_from_catalog(
+                CATALOG["plugin_import_profiled"],
+                package_root=PACKAGE_ROOT,
+                extra=merge_extra(
+                    META,
+                    {
+                        "plugin": profile["plugin"],
+                        "caller": "depdigest.core.loader.LazyRegistry._load_entry",
+                        "state": profile["state"],
+                        "duration_ms": round(profile["duration"] * 1000, 3),
+                        "memory_delta": profile["memory_delta"],
+                        "module_count": len(profile["new_modules"]),
+                        "new_modules": ", ".join(profile["new_modules"]),
+                    },
+                ),
+            )
+        except Exception as emit_error:
+            logger.warning(
+                "SMonitor emission failed in LazyRegistry._load_entry: signal=plugin_import_profiled plugin=%s error=%s",
+                profile["plugin"],
+                emit_error,
+            )
+
     def __getitem__(self, key):
-        self._ensure_initialized()
-        return super().__getitem__(key)
+        if self._value_mode == "proxy":
+            return self._proxy(key)
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self._misses += 1
+            value = self._load_key(key)
+            if value is self._MISSING:
+                raise
+            return value
+        self._hits += 1
+        if self._access is not None:
+            self._touch(key)
+        return value
 
     def __contains__(self, key):
-        self._ensure_initialized()
-        return super().__contains__(key)
+        if super().__contains__(key):
+            return True
+        self._ensure_discovered()
+        self._revive_failed()
+        if key not in self._identities:
+            self._resolve_identities()
+        return key in self._identities
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
 
     def keys(self):
-        self._ensure_initialized()
-        return super().keys()
+        self._ensure_discovered()
+        self._revive_failed()
+        self._resolve_identities()
+        return self._identities.keys()
 
     def values(self):
+        if self._value_mode == "proxy":
+            return [self._proxy(key) for key in self.keys()]
         self._ensure_initialized()
         return super().values()
 
     def items(self):
+        if self._value_mode == "proxy":
+            return [(key, self._proxy(key)) for key in self.keys()]
         self._ensure_initialized()
         return super().items()
 
     def get(self, key, default=None):
-        self._ensure_initialized()
-        return super().get(key, default)
+        try:
+            return self[key]
+        except KeyError:
+            return default
@@ -0,0 +1,41 @@
+"""
+Pytest helpers for libraries integrating DepDigest.
+
+Enable them with ``pytest_plugins = ["depdigest.testing"]`` in a
+``conftest.py``. This module imports pytest and is not loaded by
+``import depdigest``.
+"""
+import pytest
+
+from .core.import_guard import soft_import_guard
+
+
+@pytest.fixture
+def import_leak_guard():
+    """
+    Factory fixture returning active `soft_import_guard` guards.
+
+    Each call starts a guard that stays active until the test ends:
+
+        def test_cli_is_lazy(import_leak_guard):
+            guard = import_leak_guard("my_pkg")
+            import my_pkg.cli
+            assert guard.leaks == []
+
+    With ``strict=True`` the first soft-dependency import raises
+    `ImportLeakError`, and the test fails at teardown even if the guarded
+    code swallowed it.
+    """
+    guards = []
+
+    def start(package_prefix, strict=False, libraries=None):
+        guard = soft_import_guard(package_prefix, strict=strict, libraries=libraries).start()
+        guards.append(guard)
+        return guard
+
+    yield start
+    for guard in reversed(guards):
+        guard.stop()
+    leaked = [guard for guard in guards if guard.strict and guard.leaks]
+    if leaked:
+        pytest.fail(leaked[0]._message(leaked[0].leaks[0]), pytrace=False)
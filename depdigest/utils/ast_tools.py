@@ -1,7 +1,7 @@
 import os
 import ast
 from collections import defaultdict
-from typing import Set, List, Dict, Tuple
+from typing import Any, Optional, Set, List, Dict, Tuple
 
 def check_top_level_imports(file_path: str, soft_deps: Set[str]) -> List[Tuple[int, str]]:
     """
@@ -27,6 +27,122 @@ def check_top_level_imports(file_path: str, soft_deps: Set[str]) -> List[Tuple[i
                     violations.append((node.lineno, node.module))
     return violations
 
+class _BindingCounter(ast.NodeVisitor):
+    """Counts the module-scope bindings of one name, at any nesting depth."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        # Set when the name may be bound in ways the parse cannot count.
+        self.opaque = False
+
+    def visit_Name(self, node):
+        if node.id == self.name and not isinstance(node.ctx, ast.Load):
+            self.count += 1
+
+    def visit_AnnAssign(self, node):
+        # A bare annotation (`name: str`) does not bind the name.
+        if node.value is not None:
+            self.visit(node.target)
+            self.visit(node.value)
+        self.visit(node.annotation)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.name == '*':
+                self.opaque = True
+            elif (alias.asname or alias.name.split('.')[0]) == self.name:
+                self.count += 1
+
+    visit_ImportFrom = visit_Import
+
+    def _visit_scope(self, node, outer_fields):
+        if getattr(node, 'name', None) == self.name:
+            self.count += 1
+        for field in outer_fields:
+            value = getattr(node, field, None)
+            for child in value if isinstance(value, list) else [value]:
+                if isinstance(child, ast.AST):
+                    self.visit(child)
+        # Names bound inside a nested scope are local unless declared global.
+        for child in ast.walk(node):
+            if isinstance(child, ast.Global) and self.name in child.names:
+                self.opaque = True
+
+    def visit_FunctionDef(self, node):
+        self._visit_scope(node, ('decorator_list', 'args', 'returns'))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        self._visit_scope(node, ('decorator_list', 'bases', 'keywords'))
+
+    def visit_Lambda(self, node):
+        self._visit_scope(node, ('args',))
+
+    def visit_arguments(self, node):
+        # Only defaults are evaluated in the enclosing (module) scope.
+        for default in node.defaults + [d for d in node.kw_defaults if d is not None]:
+            self.visit(default)
+
+    def visit_comprehension(self, node):
+        # Loop targets are local to the comprehension; walrus targets are not.
+        self.visit(node.iter)
+        for condition in node.ifs:
+            self.visit(condition)
+
+    def _visit_named(self, node, name):
+        if name == self.name:
+            self.count += 1
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        self._visit_named(node, node.name)
+
+    def visit_MatchAs(self, node):
+        self._visit_named(node, node.name)
+
+    def visit_MatchStar(self, node):
+        self._visit_named(node, node.name)
+
+    def visit_MatchMapping(self, node):
+        self._visit_named(node, node.rest)
+
+def extract_literal_assignment(file_path: str, name: str) -> Optional[Any]:
+    """
+    Returns the literal value assigned to `name` at module top level.
+
+    The file is parsed, not executed. Returns None when the file cannot be
+    read or parsed, when the assignment is not a literal, or when it is not
+    the name's only module-scope binding (for instance when the name is
+    rebound inside an `if` or `try` block, by an import, or by a star import).
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=file_path)
+        counter = _BindingCounter(name)
+        counter.visit(tree)
+    except (OSError, SyntaxError, ValueError, MemoryError, RecursionError):
+        return None
+    if counter.opaque or counter.count != 1:
+        return None
+
+    value_node = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            if any(isinstance(target, ast.Name) and target.id == name for target in node.targets):
+                value_node = node.value
+        elif isinstance(node, ast.AnnAssign):
+            if isinstance(node.target, ast.Name) and node.target.id == name and node.value is not None:
+                value_node = node.value
+    if value_node is None:
+        return None
+    try:
+        return ast.literal_eval(value_node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        # e.g. `{[]: 1}` is literal syntax but unhashable.
+        return None
+
 def validate_codebase(src_root: str, soft_deps: Set[str], exempt_files: Set[str] = None, exempt_dirs: List[str] = None) -> Dict[str, List[Tuple[int, str]]]:
     """
     Walks through a codebase and detects violations of the lazy-import rule.
@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+_VERSION_PATTERN = re.compile(
+    r"""
+    v?
+    (?:(?P<epoch>[0-9]+)!)?
+    (?P<release>[0-9]+(?:\.[0-9]+)*)
+    (?P<pre>[-_.]?(?P<pre_label>alpha|beta|preview|pre|rc|a|b|c)[-_.]?(?P<pre_number>[0-9]+)?)?
+    (?P<post>-(?P<post_implicit>[0-9]+)|[-_.]?(?:post|rev|r)[-_.]?(?P<post_number>[0-9]+)?)?
+    (?P<dev>[-_.]?dev[-_.]?(?P<dev_number>[0-9]+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_SPECIFIER_PATTERN = re.compile(r"\s*(~=|===|==|!=|<=|>=|<|>)\s*(\S+?)\s*")
+_PRE_LABELS = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+_INFINITY = float("inf")
+
+
+def _match_version(version: str):
+    match = _VERSION_PATTERN.fullmatch(version.strip())
+    if not match:
+        raise ValueError(f"Invalid version: {version!r}")
+    return match
+
+
+def _release(version: str) -> Tuple[int, ...]:
+    match = _match_version(version)
+    return tuple(int(part) for part in match.group("release").split("."))
+
+
+@lru_cache(maxsize=1024)
+def parse_version(version: str) -> Tuple:
+    """
+    Parse a PEP 440 version into a sortable key.
+
+    Local version labels are ignored. Raises ValueError for invalid versions.
+    """
+    match = _match_version(version)
+    release = tuple(int(part) for part in match.group("release").split("."))
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+
+    # Ordering within a release: dev < pre < final < post.
+    has_post = match.group("post") is not None
+    has_dev = match.group("dev") is not None
+    if match.group("pre_label"):
+        pre_key = (_PRE_LABELS[match.group("pre_label").lower()], int(match.group("pre_number") or 0))
+    elif has_dev and not has_post:
+        pre_key = (-_INFINITY,)
+    else:
+        pre_key = (_INFINITY,)
+    post_key = int(match.group("post_implicit") or match.group("post_number") or 0) if has_post else -_INFINITY
+    dev_key = int(match.group("dev_number") or 0) if has_dev else _INFINITY
+    return (int(match.group("epoch") or 0), release, pre_key, post_key, dev_key)
+
+
+def _is_prerelease(key: Tuple) -> bool:
+    return key[2] != (_INFINITY,) or key[4] != _INFINITY
+
+
+def _is_postrelease(key: Tuple) -> bool:
+    return key[3] != -_INFINITY
+
+
+def _release_prefix_matches(version: str, prefix: Tuple[int, ...]) -> bool:
+    release = _release(version)
+    release = release + (0,) * max(0, len(prefix) - len(release))
+    return release[:len(prefix)] == prefix
+
+
+def _compare(version: str, operator: str, target: str) -> bool:
+    if operator == "===":
+        return version.strip() == target
+    if target.endswith(".*"):
+        matches = _release_prefix_matches(version, _release(target[:-2]))
+        return matches if operator == "==" else not matches
+
+    key = parse_version(version)
+    target_key = parse_version(target)
+    if operator == "==":
+        return key == target_key
+    if operator == "!=":
+        return key != target_key
+    if operator == ">=":
+        return key >= target_key
+    if operator == "<=":
+        return key <= target_key
+    # Exclusive comparisons skip post-releases (">") and pre-releases ("<")
+    # of the target's own release unless the target is one itself.
+    same_release = key[:2] == target_key[:2]
+    if operator == ">":
+        return key > target_key and not (same_release and _is_postrelease(key) and not _is_postrelease(target_key))
+    if operator == "<":
+        return key < target_key and not (same_release and _is_prerelease(key) and not _is_prerelease(target_key))
+    # "~=" compatible release: ~=1.4.2 means >=1.4.2,==1.4.*
+    return key >= target_key and _release_prefix_matches(version, _release(target)[:-1])
+
+
+@lru_cache(maxsize=256)
+def parse_specifier(specifier: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Parse a comma-separated version specifier such as ``">=1.2,<2"``.
+
+    Raises ValueError for invalid clauses.
+    """
+    clauses = []
+    for clause in specifier.split(","):
+        match = _SPECIFIER_PATTERN.fullmatch(clause)
+        if not match:
+            raise ValueError(f"Invalid version specifier: {specifier!r}")
+        operator, target = match.groups()
+        if target.endswith(".*"):
+            if operator not in ("==", "!="):
+                raise ValueError(f"Invalid version specifier: {specifier!r}")
+            _release(target[:-2])
+        elif operator == "~=":
+            if len(_release(target)) < 2:
+                raise ValueError(f"Invalid version specifier: {specifier!r}")
+        elif operator != "===":
+            parse_version(target)
+        clauses.append((operator, target))
+    return tuple(clauses)
+
+
+@lru_cache(maxsize=1024)
+def version_matches(version: Optional[str], specifier: str) -> bool:
+    """
+    Return whether the installed `version` satisfies `specifier`.
+
+    Installed pre-releases and dev builds are accepted when they satisfy the
+    clauses, as PEP 440 prescribes for versions that are already installed.
+    Missing or unparseable versions never match.
+    """
+    clauses = parse_specifier(specifier)
+    if version is None:
+        return False
+    try:
+        parse_version(version)
+    except ValueError:
+        return False
+    return all(_compare(version, operator, target) for operator, target in clauses)
@@ -1,6 +1,11 @@
+import pytest
 from pathlib import Path
 
-from depdigest.utils.ast_tools import check_top_level_imports, validate_codebase
+from depdigest.utils.ast_tools import (
+    check_top_level_imports,
+    extract_literal_assignment,
+    validate_codebase,
+)
 
 
 def test_check_top_level_imports_detects_import_and_from_import(tmp_path):
@@ -46,3 +51,64 @@ def test_validate_codebase_respects_exemptions(tmp_path):
     )
 
     assert violations == {}
+
+
+def test_extract_literal_assignment_reads_single_top_level_literal(tmp_path):
+    file_path = tmp_path / "__init__.py"
+    file_path.write_text(
+        "import openmm\n"
+        "form_name: str = 'openmm.Topology'\n"
+        "def fn(form_name=None):\n"
+        "    form_name = 'inner'\n"
+        "class Form:\n"
+        "    form_name = 'attribute'\n"
+        "names = [form_name for form_name in ()]\n",
+        encoding="utf-8",
+    )
+
+    assert extract_literal_assignment(str(file_path), "form_name") == "openmm.Topology"
+
+
+@pytest.mark.parametrize(
+    "rebinding",
+    [
+        "form_name = 'runtime'\n",
+        "try:\n    form_name = 'runtime'\nexcept ImportError:\n    pass\n",
+        "if True:\n    form_name = 'runtime'\n",
+        "for form_name in ['runtime']:\n    pass\n",
+        "with open(__file__) as form_name:\n    pass\n",
+        "form_name += '.runtime'\n",
+        "form_name, other = 'runtime', 1\n",
+        "if (form_name := 'runtime'):\n    pass\n",
+        "from os import path as form_name\n",
+        "from os.path import *\n",
+        "def set_name():\n    global form_name\n    form_name = 'runtime'\n",
+    ],
+)
+def test_extract_literal_assignment_returns_none_when_name_is_rebound(tmp_path, rebinding):
+    file_path = tmp_path / "__init__.py"
+    file_path.write_text("form_name = 'static'\n" + rebinding, encoding="utf-8")
+
+    assert extract_literal_assignment(str(file_path), "form_name") is None
+
+
+def test_extract_literal_assignment_returns_none_for_non_literal_or_missing(tmp_path):
+    computed = tmp_path / "computed.py"
+    computed.write_text("PREFIX = 'x'\nform_name = PREFIX + '.y'\n", encoding="utf-8")
+    broken = tmp_path / "broken.py"
+    broken.write_text("form_name = (\n", encoding="utf-8")
+
+    assert extract_literal_assignment(str(computed), "form_name") is None
+    assert extract_literal_assignment(str(computed), "other") is None
+    assert extract_literal_assignment(str(broken), "form_name") is None
+    assert extract_literal_assignment(str(tmp_path / "missing.py"), "form_name") is None
+
+
+def test_extract_literal_assignment_returns_none_for_unevaluable_literals(tmp_path):
+    unhashable = tmp_path / "unhashable.py"
+    unhashable.write_text("form_name = {[]: 1}\n", encoding="utf-8")
+    nested = tmp_path / "nested.py"
+    nested.write_text("form_name = " + "-" * 100000 + "1\n", encoding="utf-8")
+
+    assert extract_literal_assignment(str(unhashable), "form_name") is None
+    assert extract_literal_assignment(str(nested), "form_name") is None
@@ -1,6 +1,14 @@
+import inspect
 import pytest
 import sys
 import json
+import os
+import threading
+import time
+import tracemalloc
+import types
+import zipfile
+from importlib.metadata import EntryPoint
 from unittest.mock import patch
 from depdigest import (
     is_installed,
@@ -11,8 +19,11 @@ from depdigest import (
     unregister_package_config,
     temporary_package_config,
     clear_package_configs,
+    soft_import_guard,
+    ImportLeakError,
 )
 from depdigest.core.config import resolve_config
+from depdigest.core.loader import _PluginEntry, clear_entry_point_index
 
 @pytest.fixture(autouse=True)
 def run_around_tests():
@@ -20,11 +31,13 @@ def run_around_tests():
     clear_package_configs()
     is_installed.cache_clear()
     resolve_config.cache_clear()
+    clear_entry_point_index()
     yield
     # Code that will run after each test
     clear_package_configs()
     is_installed.cache_clear()
     resolve_config.cache_clear()
+    clear_entry_point_index()
 
 def test_is_installed_caching():
     """Verify that is_installed results are cached."""
@@ -380,7 +393,7 @@ def test_get_info_supports_dict_and_json_formats():
 
     assert as_dict["module_path"] == "fakepkg"
     assert as_dict["schema"]["name"] == "depdigest.get_info"
-    assert as_dict["schema"]["version"] == "1.0"
+    assert as_dict["schema"]["version"] == "1.1"
     assert as_dict["dependency_count"] == 2
     assert as_dict["installed_count"] == 1
     assert as_dict["missing_count"] == 1
@@ -388,7 +401,7 @@ def test_get_info_supports_dict_and_json_formats():
     assert as_dict["dependencies"][0]["status"] == "installed"
     assert as_dict["dependencies"][1]["status"] == "missing"
     parsed_json = json.loads(as_json)
-    assert parsed_json["schema"]["version"] == "1.0"
+    assert parsed_json["schema"]["version"] == "1.1"
     assert parsed_json["dependencies"][0]["installed"] is True
     assert parsed_json["dependencies"][1]["installed"] is False
 
@@ -600,16 +613,897 @@ def test_smonitor_qa_profile_has_clean_schema_for_missing_dependency():
 
 def test_lazy_registry_methods_trigger_single_initialization():
     registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    module = types.SimpleNamespace(plugin_name="p1")
 
-    def fake_scan():
-        registry["p1"] = "module"
+    def fake_discover():
+        return {"p1": _PluginEntry("p1", "mylib.plugins.p1")}
 
-    with patch.object(registry, "_scan_and_load", side_effect=fake_scan) as mocked_scan:
-        assert registry.get("p1") == "module"
-        assert registry["p1"] == "module"
-        assert list(registry.values()) == ["module"]
-        assert list(registry.items()) == [("p1", "module")]
-        assert mocked_scan.call_count == 1
+    with patch.object(registry, "_discover", side_effect=fake_discover) as mocked_discover, \
+         patch("depdigest.core.loader.import_module", return_value=module) as mocked_import:
+        assert registry.get("p1") is module
+        assert registry["p1"] is module
+        assert list(registry.values()) == [module]
+        assert list(registry.items()) == [("p1", module)]
+        assert mocked_discover.call_count == 1
+        assert mocked_import.call_count == 1
+
+
+def test_lazy_registry_getitem_imports_only_requested_plugin():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    modules = {
+        "mylib.plugins.a": types.SimpleNamespace(plugin_name="a"),
+        "mylib.plugins.b": types.SimpleNamespace(plugin_name="b"),
+    }
+    manifest = {
+        "a": _PluginEntry("a", "mylib.plugins.a"),
+        "b": _PluginEntry("b", "mylib.plugins.b"),
+    }
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=modules.__getitem__) as mocked_import:
+        assert registry["b"] is modules["mylib.plugins.b"]
+        mocked_import.assert_called_once_with("mylib.plugins.b")
+        assert list(registry.values()) == [modules["mylib.plugins.a"], modules["mylib.plugins.b"]]
+
+
+def test_lazy_registry_keys_answer_from_manifest_when_identity_is_known():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {"a_dir": _PluginEntry("a_dir", "mylib.plugins.a_dir", identity="a")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module") as mocked_import:
+        assert list(registry.keys()) == ["a"]
+        assert "a" in registry
+        assert "missing" not in registry
+        assert len(registry) == 1
+        mocked_import.assert_not_called()
+
+
+def test_lazy_registry_missing_key_raises_keyerror_after_resolving_identities():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {"a": _PluginEntry("a", "mylib.plugins.a")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", return_value=types.SimpleNamespace(plugin_name="a")):
+        with pytest.raises(KeyError):
+            registry["missing"]
+        assert registry.get("missing", "default") == "default"
+        assert list(registry.keys()) == ["a"]
+
+
+def test_lazy_registry_static_identity_avoids_imports(tmp_path, monkeypatch):
+    plugins = tmp_path / "staticpkg" / "plugins"
+    for name, body in {
+        "literal_dir": "form_name = 'literal'\n",
+        "computed_dir": "form_name = 'comp' + 'uted'\n",
+    }.items():
+        (plugins / name).mkdir(parents=True)
+        (plugins / name / "__init__.py").write_text(body, encoding="utf-8")
+    (tmp_path / "staticpkg" / "__init__.py").write_text("", encoding="utf-8")
+    (plugins / "__init__.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = LazyRegistry("staticpkg.plugins", str(plugins), static_identity=True)
+    try:
+        assert "literal" in registry
+        assert "staticpkg.plugins.literal_dir" not in sys.modules
+        assert sorted(registry.keys()) == ["computed", "literal"]
+        assert "staticpkg.plugins.literal_dir" not in sys.modules
+        assert "staticpkg.plugins.computed_dir" in sys.modules
+        assert registry["literal"].form_name == "literal"
+    finally:
+        for name in [m for m in sys.modules if m == "staticpkg" or m.startswith("staticpkg.")]:
+            del sys.modules[name]
+
+
+def test_lazy_registry_static_identity_imports_plugins_that_rebind_the_key(tmp_path, monkeypatch):
+    plugins = tmp_path / "rebindpkg" / "plugins"
+    for name, body in {
+        "try_dir": "form_name = 'static'\ntry:\n    form_name = 'runtime'\nexcept ImportError:\n    pass\n",
+        "if_dir": "form_name = 'draft'\nif True:\n    form_name = 'final'\n",
+    }.items():
+        (plugins / name).mkdir(parents=True)
+        (plugins / name / "__init__.py").write_text(body, encoding="utf-8")
+    (tmp_path / "rebindpkg" / "__init__.py").write_text("", encoding="utf-8")
+    (plugins / "__init__.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = LazyRegistry("rebindpkg.plugins", str(plugins), static_identity=True)
+    try:
+        assert "static" not in registry
+        assert sorted(registry.keys()) == ["final", "runtime"]
+        assert registry["runtime"].form_name == "runtime"
+    finally:
+        _drop_modules("rebindpkg")
+
+
+@patch("depdigest.core.loader.resolve_config", return_value=DepConfig())
+def test_lazy_registry_manifest_cache_reuses_filesystem_manifest(mock_config, tmp_path):
+    plugins = tmp_path / "plugins"
+    (plugins / "a_dir").mkdir(parents=True)
+    (plugins / "a_dir" / "__init__.py").write_text("form_name = 'a'\n", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    def make_registry():
+        return LazyRegistry(
+            "cachepkg.plugins", str(plugins), static_identity=True, manifest_cache=True, cache_dir=str(cache_dir)
+        )
+
+    first = make_registry()
+    assert first.diagnostics()["manifest_cache"] is None
+    assert list(first.keys()) == ["a"]
+    assert first.diagnostics()["manifest_cache"] == "miss"
+
+    second = make_registry()
+    with patch("os.scandir", side_effect=AssertionError("scandir must not run on a cache hit")):
+        assert list(second.keys()) == ["a"]
+    assert second.diagnostics()["manifest_cache"] == "hit"
+
+    (plugins / "b_dir").mkdir()
+    (plugins / "b_dir" / "__init__.py").write_text("form_name = 'b'\n", encoding="utf-8")
+    stat = os.stat(plugins)
+    os.utime(plugins, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    third = make_registry()
+    assert sorted(third.keys()) == ["a", "b"]
+    assert third.diagnostics()["manifest_cache"] == "miss"
+
+
+def test_lazy_registry_manifest_cache_reuses_entry_points(tmp_path):
+    class FakeEPCollection:
+        def select(self, group):
+            return [EntryPoint("json_plugin", "json", group)]
+
+    def make_registry():
+        return LazyRegistry(
+            "mylib.plugins",
+            "/unused",
+            discovery_mode="entry_points",
+            entrypoint_group="mylib.plugins",
+            manifest_cache=True,
+            cache_dir=str(tmp_path),
+        )
+
+    with patch("depdigest.core.loader.environment_fingerprint", return_value="env-1"), \
+         patch("depdigest.core.loader.resolve_config", return_value=DepConfig()):
+        with patch("depdigest.core.loader.entry_points", return_value=FakeEPCollection()):
+            assert list(make_registry().keys()) == ["json_plugin"]
+        with patch("depdigest.core.loader.entry_points", side_effect=AssertionError("no scan on a hit")):
+            registry = make_registry()
+            assert registry["json_plugin"] is json
+            assert registry.diagnostics()["manifest_cache"] == "hit"
+
+
+def test_lazy_registry_concurrent_first_access_loads_each_plugin_once():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    names = [f"p{i}" for i in range(8)]
+    import_calls = []
+    errors = []
+    results = []
+    barrier = threading.Barrier(24)
+
+    def slow_discover():
+        time.sleep(0.01)
+        return {name: _PluginEntry(name, f"mylib.plugins.{name}") for name in names}
+
+    def slow_import(module_path):
+        import_calls.append(module_path)
+        time.sleep(0.005)
+        return types.SimpleNamespace(plugin_name=module_path.rsplit(".", 1)[1])
+
+    def worker(index):
+        barrier.wait()
+        try:
+            if index % 3 == 0:
+                results.append([key for key, _ in registry.items()])
+            elif index % 3 == 1:
+                results.append(sorted(registry.keys()))
+            else:
+                results.append([registry[names[index % len(names)]].plugin_name])
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    with patch.object(registry, "_discover", side_effect=slow_discover) as mocked_discover, \
+         patch("depdigest.core.loader.import_module", side_effect=slow_import):
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(24)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert mocked_discover.call_count == 1
+    assert sorted(import_calls) == sorted(f"mylib.plugins.{name}" for name in names)
+    for index, result in enumerate(results):
+        assert result == names or (len(result) == 1 and result[0] in names)
+    assert list(registry) == names
+
+
+def test_lazy_registry_concurrent_lookups_with_eviction_never_miss_existing_keys():
+    previous_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", max_loaded=5)
+    names = [f"p{i}" for i in range(30)]
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in names}
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def worker(seed):
+        barrier.wait()
+        try:
+            for step in range(2000):
+                name = names[(seed * 7 + step * 13) % len(names)]
+                assert registry[name].plugin_name == name
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    try:
+        with patch.object(registry, "_discover", return_value=manifest), \
+             patch("depdigest.core.loader.import_module", side_effect=_plugin_module):
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        sys.setswitchinterval(previous_interval)
+
+    assert errors == []
+    assert registry.diagnostics()["evictions"] > 0
+    assert len(registry.diagnostics()["loaded"]) <= 5 + 8
+
+
+def test_lazy_registry_parallel_load_keeps_order_and_reports_each_failure():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", max_workers=4)
+    names = [f"p{i}" for i in range(8)]
+    active = []
+    peak = []
+    guard = threading.Lock()
+
+    def slow_import(module_path):
+        name = module_path.rsplit(".", 1)[1]
+        with guard:
+            active.append(name)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with guard:
+            active.remove(name)
+        if name in {"p2", "p5"}:
+            raise RuntimeError(f"{name} broken")
+        return types.SimpleNamespace(plugin_name=name)
+
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}") for name in names}
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=slow_import), \
+         patch.object(registry, "_emit_plugin_load_failed") as mocked_emit:
+        assert [key for key, _ in registry.items()] == [n for n in names if n not in {"p2", "p5"}]
+
+    assert max(peak) > 1
+    assert sorted(call.args[0] for call in mocked_emit.call_args_list) == ["p2", "p5"]
+    assert registry.diagnostics()["failed"] == ["p2", "p5"]
+
+
+def test_lazy_registry_rejects_invalid_max_workers():
+    with pytest.raises(ValueError, match="max_workers"):
+        LazyRegistry("mylib.plugins", "/fake/path", max_workers=0)
+
+
+def _gated_registry(gated_name, gate, entered=None):
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in ("a", "b", "c")}
+
+    def gated_import(module_path):
+        name = module_path.rsplit(".", 1)[1]
+        if name == gated_name:
+            if entered is not None:
+                entered.set()
+            assert gate.wait(5)
+        return types.SimpleNamespace(plugin_name=name)
+
+    return registry, manifest, gated_import
+
+
+def test_lazy_registry_warm_up_priority_keys_reports_progress():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in ("a", "b", "c")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module",
+               side_effect=lambda path: types.SimpleNamespace(plugin_name=path.rsplit(".", 1)[1])) as mocked_import:
+        handle = registry.warm_up(keys=["c", "missing"])
+        assert handle.wait(5)
+
+    progress = handle.progress()
+    assert progress["state"] == "done"
+    assert progress["total"] == 2
+    assert progress["completed"] == 2
+    assert progress["failed"] == ["missing"]
+    assert set(progress["timings"]) == {"c", "missing"}
+    assert progress["elapsed"] >= 0
+    assert registry.diagnostics()["warm_up"]["state"] == "done"
+    assert registry.diagnostics()["loaded"] == ["c"]
+    assert [call.args[0] for call in mocked_import.call_args_list] == ["mylib.plugins.c"]
+
+
+def test_lazy_registry_foreground_lookup_does_not_wait_for_warm_up():
+    gate = threading.Event()
+    registry, manifest, gated_import = _gated_registry("a", gate)
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=gated_import):
+        handle = registry.warm_up()
+        assert registry["b"].plugin_name == "b"
+        assert not handle.done
+        gate.set()
+        assert handle.wait(5)
+        assert list(registry.values()) and registry._initialized
+
+    assert handle.progress()["state"] == "done"
+    assert handle.progress()["completed"] == 3
+
+
+def test_lazy_registry_warm_up_can_be_cancelled():
+    gate = threading.Event()
+    entered = threading.Event()
+    registry, manifest, gated_import = _gated_registry("a", gate, entered)
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=gated_import):
+        handle = registry.warm_up()
+        assert entered.wait(5)
+        handle.cancel()
+        gate.set()
+        assert handle.wait(5)
+
+    progress = handle.progress()
+    assert progress["state"] == "cancelled"
+    assert progress["completed"] == 1
+    assert registry.diagnostics()["loaded"] == ["a"]
+    assert not registry._initialized
+
+
+def test_lazy_registry_proxy_values_defer_import_until_attribute_access():
+    registry = LazyRegistry(
+        "mylib.plugins", "/fake/path", attr_name="plugin_name", static_identity=True, value_mode="proxy"
+    )
+    manifest = {"a_dir": _PluginEntry("a_dir", "mylib.plugins.a_dir", identity="a")}
+    module = types.SimpleNamespace(plugin_name="a", run=lambda: "ran")
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.resolve_config", return_value=DepConfig()), \
+         patch("depdigest.core.loader.import_module", return_value=module) as mocked_import:
+        proxy = registry["a"]
+        assert proxy is registry.get("a")
+        assert proxy.plugin_name == "a"
+        assert proxy.__name__ == "mylib.plugins.a_dir"
+        assert proxy.__depdigest_plugin__["plugin"] == "a_dir"
+        assert [key for key, _ in registry.items()] == ["a"]
+        assert "not loaded" in repr(proxy)
+        mocked_import.assert_not_called()
+
+        assert proxy.run() == "ran"
+        mocked_import.assert_called_once_with("mylib.plugins.a_dir")
+
+
+def test_lazy_registry_proxy_raises_configured_error_for_missing_soft_dependency():
+    class MissingPluginDependency(Exception):
+        pass
+
+    cfg = DepConfig(
+        libraries={"heavy": {"type": "soft", "pypi": "heavy-lib"}},
+        mapping={"a_dir": "heavy"},
+        exception_class=MissingPluginDependency,
+    )
+    registry = LazyRegistry(
+        "mylib.plugins", "/fake/path", attr_name="plugin_name", static_identity=True, value_mode="proxy"
+    )
+    manifest = {"a_dir": _PluginEntry("a_dir", "mylib.plugins.a_dir", identity="a")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.resolve_config", return_value=cfg), \
+         patch("depdigest.core.checker.is_installed", return_value=False), \
+         patch("depdigest.core.loader.import_module") as mocked_import:
+        proxy = registry["a"]
+        assert proxy.plugin_name == "a"
+        with pytest.raises(MissingPluginDependency, match="heavy-lib"):
+            proxy.run
+        mocked_import.assert_not_called()
+
+
+def test_lazy_registry_proxy_skips_non_static_plugins_with_missing_dependency():
+    class MissingPluginDependency(Exception):
+        pass
+
+    cfg = DepConfig(
+        libraries={"heavy": {"type": "soft", "pypi": "heavy-lib"}},
+        mapping={"needs": "heavy"},
+        exception_class=MissingPluginDependency,
+    )
+    registry = LazyRegistry(
+        "mylib.plugins", "/fake/path", attr_name="plugin_name", static_identity=True, value_mode="proxy"
+    )
+    # Neither plugin has a literal key, so both need an import to learn it.
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}") for name in ("needs", "free")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.resolve_config", return_value=cfg), \
+         patch("depdigest.core.checker.is_installed", side_effect=lambda name: name != "heavy"), \
+         patch("depdigest.core.loader.import_module", side_effect=_plugin_module) as mocked_import:
+        assert [key for key, _ in registry.items()] == ["free"]
+        assert registry.get("needs") is None
+
+    mocked_import.assert_called_once_with("mylib.plugins.free")
+    assert registry.failures()["needs"]["exception_type"] == "MissingPluginDependency"
+
+
+def test_lazy_registry_rejects_invalid_value_mode():
+    with pytest.raises(ValueError, match="value_mode"):
+        LazyRegistry("mylib.plugins", "/fake/path", value_mode="lazy")
+    with pytest.raises(ValueError, match="static_identity"):
+        LazyRegistry("mylib.plugins", "/fake/path", value_mode="proxy")
+
+
+def _plugin_module(module_path):
+    return types.SimpleNamespace(plugin_name=module_path.rsplit(".", 1)[1])
+
+
+def test_lazy_registry_lru_eviction_reloads_on_demand_and_counts():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", max_loaded=2)
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in ("a", "b", "c")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=_plugin_module) as mocked_import:
+        registry["a"]
+        registry["b"]
+        registry["a"]
+        registry["c"]
+        assert registry.diagnostics()["loaded"] == ["a", "c"]
+        assert "b" in registry
+        registry["b"]
+        assert registry.diagnostics()["loaded"] == ["b", "c"]
+
+    imported = [call.args[0] for call in mocked_import.call_args_list]
+    assert imported.count("mylib.plugins.b") == 2
+    diagnostics = registry.diagnostics()
+    assert (diagnostics["hits"], diagnostics["misses"], diagnostics["evictions"]) == (1, 4, 2)
+
+
+def test_lazy_registry_idle_ttl_eviction(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("depdigest.core.loader.time.monotonic", lambda: clock[0])
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", idle_ttl=60)
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in ("a", "b")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=_plugin_module):
+        registry["a"]
+        clock[0] += 50
+        registry["b"]
+        clock[0] += 20
+        assert registry.evict() == 1
+        assert registry.diagnostics()["loaded"] == ["b"]
+
+
+def test_lazy_registry_evict_modules_drops_plugin_from_sys_modules(tmp_path, monkeypatch):
+    plugins = tmp_path / "evictpkg" / "plugins"
+    for name in ("a_dir", "b_dir"):
+        (plugins / name).mkdir(parents=True)
+        (plugins / name / "__init__.py").write_text(f"form_name = '{name[0]}'\n", encoding="utf-8")
+    (tmp_path / "evictpkg" / "__init__.py").write_text("", encoding="utf-8")
+    (plugins / "__init__.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = LazyRegistry(
+        "evictpkg.plugins", str(plugins), static_identity=True, max_loaded=1, evict_modules=True
+    )
+    try:
+        first = registry["a"]
+        registry["b"]
+        assert "evictpkg.plugins.a_dir" not in sys.modules
+        assert not hasattr(sys.modules["evictpkg.plugins"], "a_dir")
+        assert registry["a"] is not first
+        assert registry["a"].form_name == "a"
+    finally:
+        for name in [m for m in sys.modules if m == "evictpkg" or m.startswith("evictpkg.")]:
+            del sys.modules[name]
+
+
+def test_lazy_registry_rejects_invalid_eviction_policy():
+    with pytest.raises(ValueError, match="max_loaded"):
+        LazyRegistry("mylib.plugins", "/fake/path", max_loaded=0)
+    with pytest.raises(ValueError, match="idle_ttl"):
+        LazyRegistry("mylib.plugins", "/fake/path", idle_ttl=0)
+
+
+def test_lazy_registry_records_failures_and_never_retries_by_default():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {
+        "broken": _PluginEntry("broken", "mylib.plugins.broken", identity="broken"),
+        "nameless": _PluginEntry("nameless", "mylib.plugins.nameless"),
+    }
+
+    def failing_import(module_path):
+        if module_path.endswith("broken"):
+            raise ImportError("no heavy_lib")
+        return types.SimpleNamespace()
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=failing_import) as mocked_import, \
+         patch.object(registry, "_emit_plugin_load_failed"):
+        assert registry.get("broken") is None
+        assert list(registry.values()) == []
+        assert registry.get("broken") is None
+        assert mocked_import.call_count == 2
+
+    failures = registry.failures()
+    assert sorted(failures) == ["broken", "nameless"]
+    assert failures["broken"]["exception_type"] == "ImportError"
+    assert failures["broken"]["message"] == "no heavy_lib"
+    assert failures["broken"]["duration"] >= 0
+    assert failures["broken"]["timestamp"] > 0
+    assert failures["nameless"]["exception_type"] == "AttributeError"
+
+
+def test_lazy_registry_retries_failed_plugins_after_delay_or_fingerprint_change(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("depdigest.core.loader.time.time", lambda: clock[0])
+    attempts = []
+
+    def flaky_import(module_path):
+        attempts.append(module_path)
+        if len(attempts) == 1:
+            raise ImportError("not yet")
+        return _plugin_module(module_path)
+
+    for policy in (30, "fingerprint"):
+        attempts.clear()
+        fingerprint = ["env-1"]
+        monkeypatch.setattr("depdigest.core.loader.environment_fingerprint", lambda: fingerprint[0])
+        registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", retry_failed=policy)
+        manifest = {"a": _PluginEntry("a", "mylib.plugins.a", identity="a")}
+        with patch.object(registry, "_discover", return_value=manifest), \
+             patch("depdigest.core.loader.import_module", side_effect=flaky_import), \
+             patch.object(registry, "_emit_plugin_load_failed"):
+            assert registry.get("a") is None
+            assert registry.get("a") is None
+            assert len(attempts) == 1
+            clock[0] += 31
+            fingerprint[0] = "env-2"
+            assert registry["a"].plugin_name == "a"
+            assert len(attempts) == 2
+            assert registry.failures() == {}
+
+
+def test_lazy_registry_full_loads_and_membership_retry_failed_plugins(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("depdigest.core.loader.time.time", lambda: clock[0])
+    broken = {"bad"}
+
+    def import_plugin(module_path):
+        if module_path.rsplit(".", 1)[1] in broken:
+            raise ImportError("not yet")
+        return _plugin_module(module_path)
+
+    for check in ("values", "contains", "keys"):
+        broken.add("bad")
+        registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name", retry_failed=30)
+        manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}") for name in ("good", "bad")}
+        with patch.object(registry, "_discover", return_value=manifest), \
+             patch("depdigest.core.loader.import_module", side_effect=import_plugin), \
+             patch.object(registry, "_emit_plugin_load_failed"):
+            assert [value.plugin_name for value in registry.values()] == ["good"]
+            broken.clear()
+            assert [value.plugin_name for value in registry.values()] == ["good"]
+            clock[0] += 31
+            if check == "values":
+                assert [value.plugin_name for value in registry.values()] == ["good", "bad"]
+            elif check == "contains":
+                assert "bad" in registry
+            else:
+                assert list(registry.keys()) == ["good", "bad"]
+            assert registry.failures() == {}
+
+
+def test_lazy_registry_rejects_invalid_retry_policy():
+    with pytest.raises(ValueError, match="retry_failed"):
+        LazyRegistry("mylib.plugins", "/fake/path", retry_failed="sometimes")
+
+
+def test_lazy_registry_refresh_picks_up_added_and_removed_plugins(tmp_path, monkeypatch):
+    plugins = tmp_path / "refreshpkg" / "plugins"
+
+    def write_plugin(name):
+        (plugins / name).mkdir(parents=True)
+        (plugins / name / "__init__.py").write_text(f"form_name = '{name[0]}'\n", encoding="utf-8")
+
+    write_plugin("a_dir")
+    write_plugin("b_dir")
+    (tmp_path / "refreshpkg" / "__init__.py").write_text("", encoding="utf-8")
+    (plugins / "__init__.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = LazyRegistry("refreshpkg.plugins", str(plugins), static_identity=True)
+    try:
+        first = registry["a"]
+        assert sorted(registry.keys()) == ["a", "b"]
+
+        write_plugin("c_dir")
+        (plugins / "b_dir" / "__init__.py").unlink()
+        (plugins / "b_dir").rmdir()
+        (plugins / "a_dir" / "__init__.py").write_text("form_name = 'renamed'\n", encoding="utf-8")
+
+        report = registry.refresh()
+        assert report == {"added": ["c_dir"], "removed": ["b_dir"], "changed": []}
+        assert sorted(registry.keys()) == ["a", "c"]
+        assert registry["a"] is first
+        assert "refreshpkg.plugins.c_dir" not in sys.modules
+        assert registry["c"].form_name == "c"
+        assert registry.refresh() == {"added": [], "removed": [], "changed": []}
+    finally:
+        for name in [m for m in sys.modules if m == "refreshpkg" or m.startswith("refreshpkg.")]:
+            del sys.modules[name]
+
+
+def test_lazy_registry_refresh_entry_points_rescans_only_on_fingerprint_change(monkeypatch):
+    eps = [EntryPoint("json_plugin", "json", "mylib.plugins")]
+
+    class FakeEPCollection:
+        def select(self, group):
+            return list(eps)
+
+    fingerprint = ["env-1"]
+    monkeypatch.setattr("depdigest.core.loader.environment_fingerprint", lambda: fingerprint[0])
+    registry = LazyRegistry(
+        "mylib.plugins", "/unused", discovery_mode="entry_points", entrypoint_group="mylib.plugins"
+    )
+
+    with patch("depdigest.core.loader.resolve_config", return_value=DepConfig()):
+        with patch("depdigest.core.loader.entry_points", return_value=FakeEPCollection()):
+            assert list(registry.values()) == [json]
+        with patch("depdigest.core.loader.entry_points", side_effect=AssertionError("no rescan")):
+            assert registry.refresh() == {"added": [], "removed": [], "changed": []}
+
+        eps.append(EntryPoint("os_plugin", "os", "mylib.plugins"))
+        fingerprint[0] = "env-2"
+        with patch("depdigest.core.loader.entry_points", return_value=FakeEPCollection()):
+            assert registry.refresh() == {"added": ["os_plugin"], "removed": [], "changed": []}
+        assert dict.__contains__(registry, "os_plugin")
+        assert list(registry.values()) == [json, os]
+
+
+def test_lazy_registry_entry_point_index_is_shared_across_groups(monkeypatch):
+    class FakeEntryPoints:
+        groups = {"mylib.plugins", "mylib.exporters"}
+
+        def __iter__(self):
+            return iter(all_eps)
+
+        def select(self, group):
+            raise AssertionError("the index is built in one pass")
+
+    all_eps = [
+        EntryPoint("json_plugin", "json", "mylib.plugins"),
+        EntryPoint("os_exporter", "os", "mylib.exporters"),
+    ]
+    fingerprint = ["env-1"]
+    monkeypatch.setattr("depdigest.core.loader.environment_fingerprint", lambda: fingerprint[0])
+
+    def make_registry(group):
+        return LazyRegistry(
+            "mylib.plugins", "/unused", discovery_mode="entry_points", entrypoint_group=group, static_identity=True
+        )
+
+    with patch("depdigest.core.loader.resolve_config", return_value=DepConfig()), \
+         patch("depdigest.core.loader.entry_points", return_value=FakeEntryPoints()) as mocked_eps:
+        plugins = make_registry("mylib.plugins")
+        exporters = make_registry("mylib.exporters")
+        assert list(plugins.keys()) == ["json_plugin"]
+        assert list(exporters.keys()) == ["os_exporter"]
+        assert mocked_eps.call_count == 1
+        assert plugins.diagnostics()["loaded"] == []
+
+        fingerprint[0] = "env-2"
+        assert list(make_registry("mylib.plugins").keys()) == ["json_plugin"]
+        assert mocked_eps.call_count == 2
+
+
+class _MockDirEntry:
+    def __init__(self, name):
+        self.name = name
+
+    def is_dir(self):
+        return True
+
+
+@pytest.mark.parametrize("precedence", ["filesystem", "entry_points"])
+def test_lazy_registry_hybrid_discovery_merges_sources_with_precedence(precedence):
+    class FakeEntryPoints:
+        groups = {"mylib.plugins"}
+
+        def __iter__(self):
+            return iter(self.select("mylib.plugins"))
+
+        def select(self, group):
+            return [EntryPoint("shared", "json", group), EntryPoint("extra", "os", group)]
+
+    local = {
+        "mylib.plugins.a_dir": types.SimpleNamespace(plugin_name="shared"),
+        "mylib.plugins.b_dir": types.SimpleNamespace(plugin_name="b"),
+    }
+    registry = LazyRegistry(
+        "mylib.plugins",
+        "/fake/path",
+        attr_name="plugin_name",
+        discovery_mode="hybrid",
+        entrypoint_group="mylib.plugins",
+        precedence=precedence,
+    )
+
+    with patch("os.path.exists", return_value=True), \
+         patch("os.scandir", return_value=[_MockDirEntry("a_dir"), _MockDirEntry("b_dir")]), \
+         patch("depdigest.core.loader.entry_points", return_value=FakeEntryPoints()) as mocked_eps, \
+         patch("depdigest.core.loader.resolve_config", return_value=DepConfig()) as mocked_config, \
+         patch("depdigest.core.loader.import_module", side_effect=local.__getitem__):
+        expected = local["mylib.plugins.a_dir"] if precedence == "filesystem" else json
+        assert registry["shared"] is expected
+        assert registry["extra"] is os
+        assert dict(registry.items())["shared"] is expected
+        assert sorted(registry.keys()) == ["b", "extra", "shared"]
+        assert registry.diagnostics()["shadowed"] == (["shared"] if precedence == "filesystem" else ["a_dir"])
+        assert mocked_eps.call_count == 1
+        assert mocked_config.call_count == 1
+
+
+def test_lazy_registry_hybrid_requires_group_and_valid_precedence():
+    with pytest.raises(ValueError, match="entrypoint_group"):
+        LazyRegistry("mylib.plugins", "/fake/path", discovery_mode="hybrid")
+    with pytest.raises(ValueError, match="precedence"):
+        LazyRegistry("mylib.plugins", "/fake/path", precedence="newest")
+
+
+def _drop_modules(prefix):
+    for name in [m for m in sys.modules if m == prefix or m.startswith(prefix + ".")]:
+        del sys.modules[name]
+
+
+def test_lazy_registry_package_discovery_reads_zip_archives(tmp_path, monkeypatch):
+    archive = tmp_path / "plugins.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("zippkg/__init__.py", "")
+        zf.writestr("zippkg/plugins/__init__.py", "")
+        zf.writestr("zippkg/plugins/a_dir/__init__.py", "form_name = 'a'\n")
+        zf.writestr("zippkg/plugins/helpers.py", "")
+    monkeypatch.syspath_prepend(str(archive))
+
+    try:
+        registry = LazyRegistry("zippkg.plugins", "/unused", discovery_mode="package")
+        assert list(registry.keys()) == ["a"]
+        assert registry["a"].form_name == "a"
+
+        with patch("pkgutil.iter_modules", side_effect=AssertionError("listing is cached per path entry")):
+            assert list(LazyRegistry("zippkg.plugins", "/unused", discovery_mode="package").keys()) == ["a"]
+    finally:
+        _drop_modules("zippkg")
+
+
+def test_lazy_registry_package_discovery_spans_namespace_package_portions(tmp_path, monkeypatch):
+    for root, plugin in (("first", "x_dir"), ("second", "y_dir")):
+        plugin_dir = tmp_path / root / "nspkg" / "plugins" / plugin
+        plugin_dir.mkdir(parents=True)
+        (plugin_dir / "__init__.py").write_text(f"form_name = '{plugin[0]}'\n", encoding="utf-8")
+        monkeypatch.syspath_prepend(str(tmp_path / root))
+
+    try:
+        registry = LazyRegistry("nspkg.plugins", "/unused", discovery_mode="package", static_identity=True)
+        assert sorted(registry.keys()) == ["x", "y"]
+        assert "nspkg.plugins.x_dir" not in sys.modules
+        assert registry["y"].form_name == "y"
+    finally:
+        _drop_modules("nspkg")
+
+
+def test_lazy_registry_profile_imports_records_time_memory_and_new_modules(tmp_path, monkeypatch):
+    plugins_dir = tmp_path / "profpkg" / "plugins"
+    for name, body in (("heavy", "import profpkg_softdep\nform_name = 'heavy'\nBLOB = [bytes(1024) for _ in range(256)]\n"),
+                       ("broken", "raise ImportError('no backend')\n")):
+        (plugins_dir / name).mkdir(parents=True)
+        (plugins_dir / name / "__init__.py").write_text(body, encoding="utf-8")
+    (tmp_path / "profpkg" / "__init__.py").write_text("", encoding="utf-8")
+    (plugins_dir / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "profpkg_softdep.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    try:
+        registry = LazyRegistry("profpkg.plugins", str(plugins_dir), profile_imports=True)
+        with patch.object(registry, "_emit_import_profile") as mocked_emit, \
+             patch.object(registry, "_emit_plugin_load_failed"):
+            assert list(registry.keys()) == ["heavy"]
+
+        report = registry.import_profile()
+        assert report["enabled"] is True
+        assert sorted(report["plugins"]) == ["broken", "heavy"]
+        heavy = report["plugins"]["heavy"]
+        assert (heavy["identity"], heavy["state"]) == ("heavy", "loaded")
+        assert {"profpkg.plugins.heavy", "profpkg_softdep"} <= set(heavy["new_modules"])
+        assert heavy["memory_delta"] > 256 * 1024
+        assert report["plugins"]["broken"]["state"] == "failed"
+        assert report["total_duration"] >= heavy["duration"] > 0
+        assert sorted(report["slowest"]) == ["broken", "heavy"]
+        assert sorted(call.args[0]["plugin"] for call in mocked_emit.call_args_list) == ["broken", "heavy"]
+        assert not tracemalloc.is_tracing()
+    finally:
+        _drop_modules("profpkg")
+        _drop_modules("profpkg_softdep")
+
+
+def test_lazy_registry_without_profiling_takes_no_measurements():
+    registry = LazyRegistry("mylib.plugins", "/fake/path", attr_name="plugin_name")
+    manifest = {name: _PluginEntry(name, f"mylib.plugins.{name}", identity=name) for name in ("a", "b")}
+
+    with patch.object(registry, "_discover", return_value=manifest), \
+         patch("depdigest.core.loader.import_module", side_effect=_plugin_module), \
+         patch("depdigest.core.loader._ImportProbe", side_effect=AssertionError("probe created")), \
+         patch.object(registry, "_emit_import_profile") as mocked_emit:
+        assert [key for key, _ in registry.items()] == ["a", "b"]
+
+    mocked_emit.assert_not_called()
+    assert registry.import_profile()["plugins"] == {}
+
+
+@pytest.fixture
+def leaky_modules(tmp_path, monkeypatch):
+    (tmp_path / "leaksoft").mkdir()
+    (tmp_path / "leaksoft" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "leaksoft" / "unit.py").write_text("", encoding="utf-8")
+    (tmp_path / "leakhard.py").write_text("", encoding="utf-8")
+    (tmp_path / "leakhost.py").write_text(
+        "def fast():\n    import leakhard\n\n"
+        "def slow():\n    try:\n        import leaksoft.unit\n    except ImportError:\n        pass\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    register_package_config(
+        "leakhost",
+        DepConfig(libraries={"leaksoft.unit": {"type": "soft"}, "leakhard": {"type": "hard"}}),
+    )
+    yield
+    unregister_package_config("leakhost")
+    for prefix in ("leaksoft", "leakhard", "leakhost"):
+        _drop_modules(prefix)
+
+
+def test_soft_import_guard_records_soft_imports_with_stack(leaky_modules):
+    import leakhost
+
+    with soft_import_guard("leakhost") as guard:
+        leakhost.fast()
+        assert is_installed("leaksoft.unit")
+        assert guard.leaks == []
+        leakhost.slow()
+
+    assert [(leak["module"], leak["library"]) for leak in guard.leaks] == [
+        ("leaksoft", "leaksoft.unit"),
+        ("leaksoft.unit", "leaksoft.unit"),
+    ]
+    assert "leakhost.py" in guard.leaks[0]["stack"] and "in slow" in guard.leaks[0]["stack"]
+    assert not any(type(finder).__name__ == "_SoftImportFinder" for finder in sys.meta_path)
+
+
+def test_soft_import_guard_strict_raises_past_import_error_fallbacks(leaky_modules):
+    import leakhost
+
+    with pytest.raises(ImportLeakError, match="leaksoft"):
+        with soft_import_guard("leakhost", strict=True):
+            leakhost.slow()
+    assert "leaksoft" not in sys.modules
+
+
+def test_import_leak_guard_fixture_stops_guards_at_teardown(leaky_modules, import_leak_guard):
+    guard = import_leak_guard("leakhost")
+    import leakhost
+    leakhost.slow()
+
+    assert [leak["module"] for leak in guard.leaks] == ["leaksoft", "leaksoft.unit"]
+    assert any(type(finder).__name__ == "_SoftImportFinder" for finder in sys.meta_path)
 
 
 def test_lazy_registry_ensure_initialized_returns_if_already_initializing():
@@ -626,3 +1520,402 @@ def test_lazy_registry_scan_returns_when_directory_missing():
     with patch("os.path.exists", return_value=False):
         registry._scan_and_load()
     assert list(registry.keys()) == []
+
+
+def test_dep_digest_conditional_logic_resolves_positional_keyword_and_defaults():
+    @dep_digest('opt_lib', when={'engine': 'openmm', 'precision': 'double'})
+    def cond_func(item, engine='native', *, precision='double'):
+        return item
+
+    with patch('depdigest.core.checker.is_installed', return_value=False):
+        assert cond_func(1) == 1
+        assert cond_func(1, 'openmm', precision='single') == 1
+        with pytest.raises(ImportError):
+            cond_func(1, 'openmm')
+        with pytest.raises(ImportError):
+            cond_func(item=1, engine='openmm', precision='double')
+
+
+def test_dep_digest_conditional_logic_skips_signature_binding_when_compilable():
+    @dep_digest('opt_lib', when={'mode': 'strict'})
+    def cond_func(mode='relaxed'):
+        return 'Success'
+
+    with patch('inspect.Signature.bind', side_effect=AssertionError('bind called')):
+        assert cond_func(mode='relaxed') == 'Success'
+
+
+def test_dep_digest_conditional_logic_falls_back_to_binding_for_variadic_keys():
+    @dep_digest('opt_lib', when={'options': {'mode': 'strict'}})
+    def cond_func(**options):
+        return 'Success'
+
+    with patch('depdigest.core.checker.is_installed', return_value=False):
+        assert cond_func(mode='relaxed') == 'Success'
+        with pytest.raises(ImportError):
+            cond_func(mode='strict')
+
+
+def test_dep_digest_specialize_skips_checks_until_epoch_changes():
+    calls = []
+
+    @dep_digest('json', specialize=True)
+    def func_needing_json():
+        return 'ok'
+
+    with patch('depdigest.core.decorator.check_dependency', side_effect=lambda *a, **k: calls.append(a)):
+        assert func_needing_json() == 'ok'
+        assert func_needing_json() == 'ok'
+        assert len(calls) == 1
+
+        is_installed.cache_clear()
+        assert func_needing_json() == 'ok'
+        assert len(calls) == 2
+
+        with temporary_package_config('fakepkg_epoch', DepConfig()):
+            assert func_needing_json() == 'ok'
+        assert func_needing_json() == 'ok'
+        assert len(calls) == 4
+
+
+def test_dep_digest_specialize_does_not_cache_failed_checks():
+    @dep_digest('missing_lib', specialize=True)
+    def func_needing_lib():
+        return 'ok'
+
+    with patch('depdigest.core.checker.is_installed', return_value=False):
+        with pytest.raises(ImportError):
+            func_needing_lib()
+        with pytest.raises(ImportError):
+            func_needing_lib()
+
+
+def test_dep_digest_stacked_decorators_collapse_into_single_wrapper():
+    def original(mode='relaxed'):
+        return 'Success'
+
+    inner = dep_digest('lib_b', when={'mode': 'strict'})(original)
+    outer = dep_digest('lib_a')(inner)
+
+    assert outer.__wrapped__ is original
+    assert [dep['library'] for dep in outer._dependencies] == ['lib_b', 'lib_a']
+
+    checked = []
+    with patch('depdigest.core.decorator.check_dependency', side_effect=lambda lib, **k: checked.append(lib)):
+        assert outer() == 'Success'
+        assert checked == ['lib_a']
+        assert outer(mode='strict') == 'Success'
+        assert checked == ['lib_a', 'lib_a', 'lib_b']
+
+
+def test_dep_digest_does_not_collapse_foreign_wrappers():
+    from functools import wraps
+
+    @dep_digest('lib_b')
+    def original():
+        return 'Success'
+
+    @wraps(original)
+    def foreign(*args, **kwargs):
+        return original(*args, **kwargs)
+
+    outer = dep_digest('lib_a')(foreign)
+    assert outer.__wrapped__ is foreign
+
+
+def test_config_epoch_increases_on_every_mutation_path():
+    from depdigest import get_config_epoch
+
+    epochs = [get_config_epoch()]
+    register_package_config('fakepkg_epoch', DepConfig())
+    epochs.append(get_config_epoch())
+    unregister_package_config('fakepkg_epoch')
+    epochs.append(get_config_epoch())
+    with temporary_package_config('fakepkg_epoch', DepConfig()):
+        epochs.append(get_config_epoch())
+    epochs.append(get_config_epoch())
+    clear_package_configs()
+    epochs.append(get_config_epoch())
+    is_installed.cache_clear()
+    epochs.append(get_config_epoch())
+
+    assert epochs == sorted(set(epochs))
+
+
+def test_dep_digest_caches_resolved_metadata_until_epoch_changes():
+    class CustomError(Exception):
+        pass
+
+    @dep_digest('missing_lib')
+    def func_needing_lib():
+        pass
+
+    with patch('depdigest.core.checker.is_installed', return_value=False):
+        with patch('depdigest.core.decorator.resolve_config', wraps=resolve_config) as mocked:
+            for _ in range(3):
+                with pytest.raises(ImportError):
+                    func_needing_lib()
+            assert mocked.call_count == 1
+
+        module_root = __name__.split('.')[0]
+        register_package_config(module_root, DepConfig(exception_class=CustomError))
+        with pytest.raises(CustomError):
+            func_needing_lib()
+
+
+def test_instrumentation_policy_rejects_unknown_values():
+    from depdigest import set_instrumentation_policy
+
+    with pytest.raises(ValueError):
+        set_instrumentation_policy('sometimes')
+    with pytest.raises(ValueError):
+        set_instrumentation_policy('sampled(1.5)')
+    with pytest.raises(ValueError):
+        DepConfig(instrumentation='sampled(x)')
+    assert DepConfig(instrumentation='sampled(0.25)').instrumentation == 'sampled(0.25)'
+
+
+def test_errors_only_instrumentation_skips_success_path_but_keeps_failures():
+    from depdigest import set_instrumentation_policy
+
+    @dep_digest('json')
+    def func_needing_json():
+        return 'ok'
+
+    @dep_digest('missing_lib')
+    def func_needing_lib():
+        return 'never'
+
+    set_instrumentation_policy('errors-only')
+    try:
+        with patch('depdigest.core.checker._instrumented_check_dependency') as instrumented:
+            assert func_needing_json() == 'ok'
+            instrumented.assert_not_called()
+
+        with patch('depdigest.core.checker.is_installed', return_value=False):
+            with pytest.raises(ImportError):
+                func_needing_lib()
+    finally:
+        set_instrumentation_policy('always')
+
+
+def test_package_instrumentation_policy_overrides_global_policy():
+    @dep_digest('json')
+    def func_needing_json():
+        return 'ok'
+
+    module_root = __name__.split('.')[0]
+    register_package_config(module_root, DepConfig(instrumentation='sampled(0.0)'))
+    with patch('depdigest.core.decorator.check_dependency') as checked:
+        assert func_needing_json() == 'ok'
+        checked.assert_not_called()
+
+    register_package_config(module_root, DepConfig(instrumentation='always'))
+    with patch('depdigest.core.decorator.check_dependency') as checked:
+        assert func_needing_json() == 'ok'
+        checked.assert_called_once()
+
+
+def test_dep_digest_preserves_coroutine_and_generator_kinds():
+    import asyncio
+
+    @dep_digest('missing_lib')
+    async def coro(value):
+        return value
+
+    @dep_digest('missing_lib')
+    def gen(n):
+        received = yield 0
+        for i in range(1, n):
+            received = yield received or i
+        return 'done'
+
+    @dep_digest('missing_lib')
+    async def agen(n):
+        for i in range(n):
+            yield i
+
+    assert inspect.iscoroutinefunction(coro)
+    assert inspect.isgeneratorfunction(gen)
+    assert inspect.isasyncgenfunction(agen)
+
+    async def collect():
+        return [item async for item in agen(3)]
+
+    with patch('depdigest.core.checker.is_installed', return_value=True):
+        assert asyncio.run(coro(5)) == 5
+        g = gen(3)
+        assert next(g) == 0
+        assert g.send('x') == 'x'
+        assert next(g) == 2
+        with pytest.raises(StopIteration) as stop:
+            next(g)
+        assert stop.value.value == 'done'
+        assert asyncio.run(collect()) == [0, 1, 2]
+
+    with patch('depdigest.core.checker.is_installed', return_value=False):
+        with pytest.raises(ImportError):
+            asyncio.run(coro(5))
+        with pytest.raises(ImportError):
+            next(gen(3))
+        with pytest.raises(ImportError):
+            asyncio.run(collect())
+
+
+def test_is_installed_probes_submodules_without_importing_parent(tmp_path):
+    package_name = "tmp_pkg_heavy_parent"
+    package_dir = tmp_path / package_name
+    (package_dir / "sub").mkdir(parents=True)
+    (package_dir / "__init__.py").write_text("raise RuntimeError('parent imported')\n", encoding="utf-8")
+    (package_dir / "sub" / "__init__.py").write_text("", encoding="utf-8")
+    (package_dir / "sub" / "leaf.py").write_text("", encoding="utf-8")
+    (package_dir / "plain.py").write_text("", encoding="utf-8")
+
+    sys.path.insert(0, str(tmp_path))
+    try:
+        assert is_installed(f"{package_name}.sub.leaf") is True
+        assert is_installed(f"{package_name}.missing") is False
+        assert is_installed(f"{package_name}.plain.child") is False
+        assert package_name not in sys.modules
+    finally:
+        sys.path.remove(str(tmp_path))
+
+
+def test_is_installed_falls_back_to_importing_probe_for_exotic_loaders():
+    from importlib.machinery import ModuleSpec
+    from depdigest.core import checker
+
+    class ExoticLoader:
+        pass
+
+    parent = ModuleSpec("exotic_parent", ExoticLoader(), is_package=True)
+    child = ModuleSpec("exotic_parent.child", ExoticLoader())
+
+    def fake_find_spec(name):
+        return {"exotic_parent": parent, "exotic_parent.child": child}.get(name)
+
+    with patch.object(checker, "find_spec", side_effect=fake_find_spec) as mocked:
+        assert is_installed("exotic_parent.child") is True
+    mocked.assert_any_call("exotic_parent.child")
+
+
+def test_is_installed_many_answers_from_single_path_scan(tmp_path):
+    from depdigest.core import checker
+    from depdigest.core.checker import is_installed_many
+
+    (tmp_path / "tmp_bulk_pkg").mkdir()
+    (tmp_path / "tmp_bulk_pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "tmp_bulk_mod.py").write_text("", encoding="utf-8")
+
+    sys.path.insert(0, str(tmp_path))
+    try:
+        with patch.object(checker, "sys") as mocked_sys:
+            mocked_sys.path = list(sys.path)
+            mocked_sys.modules = {}
+            mocked_sys.builtin_module_names = sys.builtin_module_names
+            mocked_sys.meta_path = [checker.machinery.PathFinder]
+            with patch.object(checker, "find_spec", side_effect=AssertionError("find_spec called")):
+                result = is_installed_many(["tmp_bulk_pkg", "tmp_bulk_mod", "tmp_bulk_missing", "tmp_bulk_missing.sub"])
+        assert result == {
+            "tmp_bulk_pkg": True,
+            "tmp_bulk_mod": True,
+            "tmp_bulk_missing": False,
+            "tmp_bulk_missing.sub": False,
+        }
+        # Answers are served from the is_installed cache afterwards.
+        with patch.object(checker, "find_spec", side_effect=AssertionError("find_spec called")):
+            assert is_installed("tmp_bulk_mod") is True
+    finally:
+        sys.path.remove(str(tmp_path))
+
+
+def test_persistent_cache_round_trip_and_fingerprint_invalidation(tmp_path):
+    from depdigest.core import checker
+    from depdigest.core.checker import (
+        disable_persistent_cache,
+        enable_persistent_cache,
+        is_installed_many,
+        rebuild_persistent_cache,
+    )
+
+    try:
+        assert enable_persistent_cache(str(tmp_path)) is False
+        is_installed_many(["json", "definitely_nonexistent_pkg_zzz"])
+        assert len(list(tmp_path.iterdir())) == 1
+
+        # Simulate a fresh process.
+        is_installed.cache_clear()
+        assert enable_persistent_cache(str(tmp_path)) is True
+        with patch.object(checker, "_probe_spec", side_effect=AssertionError("probed")):
+            assert is_installed("json") is True
+            assert is_installed("definitely_nonexistent_pkg_zzz") is False
+
+        is_installed.cache_clear()
+        with patch("depdigest.core.cache.environment_fingerprint", return_value="changed"):
+            assert enable_persistent_cache(str(tmp_path)) is False
+
+        assert is_installed("json") is True
+        assert rebuild_persistent_cache() == {"json": True}
+
+        is_installed.cache_clear()
+        assert enable_persistent_cache(str(tmp_path)) is True
+        assert checker._PERSISTED_AVAILABILITY == {"json": True}
+    finally:
+        disable_persistent_cache()
+
+
+def test_check_dependency_enforces_version_specifier():
+    from depdigest.core import checker
+    from depdigest.core.checker import check_dependency
+
+    index = {"modules": {"fake_mod": ["fake-dist", "1.4.0"]}, "distributions": {"fake-dist": ["fake-dist", "1.4.0"]}}
+    with patch.object(checker, "_build_distribution_index", return_value=index) as built:
+        with patch("depdigest.core.checker.is_installed", return_value=True):
+            check_dependency("fake_mod.sub", version=">=1.2,<2")
+            with pytest.raises(ImportError) as excinfo:
+                check_dependency("fake_mod", pypi_name="fake-dist", caller="demo", version=">=2")
+    assert "1.4.0" in str(excinfo.value)
+    assert ">=2" in str(excinfo.value)
+    assert built.call_count == 1
+
+
+def test_dep_digest_and_get_info_use_library_version_specifier():
+    from depdigest import get_info
+    from depdigest.core import checker
+
+    module_root = __name__.split('.')[0]
+    register_package_config(module_root, DepConfig(
+        libraries={"fake_mod": {"type": "soft", "pypi": "fake-dist", "version": ">=2"}},
+    ))
+    index = {"modules": {"fake_mod": ["fake-dist", "1.4.0"]}, "distributions": {"fake-dist": ["fake-dist", "1.4.0"]}}
+
+    @dep_digest("fake_mod")
+    def func_needing_fake():
+        return "ok"
+
+    with patch.object(checker, "_build_distribution_index", return_value=index):
+        with patch("depdigest.core.checker.is_installed", return_value=True):
+            with pytest.raises(ImportError):
+                func_needing_fake()
+            payload = get_info(module_root, format="dict")
+
+    dep = payload["dependencies"][0]
+    assert dep["status"] == "incompatible"
+    assert dep["version"] == "1.4.0"
+    assert dep["version_spec"] == ">=2"
+    assert payload["incompatible_count"] == 1
+
+
+def test_get_info_reports_versions_without_building_distribution_index():
+    from importlib.metadata import version
+    from depdigest import get_info
+    from depdigest.core import checker
+
+    register_package_config("versionless_pkg", DepConfig(
+        libraries={"json": {"type": "hard"}, "_pytest": {"type": "soft", "pypi": "pytest"}},
+    ))
+    with patch.object(checker, "_build_distribution_index", side_effect=AssertionError("index built")):
+        payload = get_info("versionless_pkg", format="dict")
+
+    versions = {dep["library"]: dep["version"] for dep in payload["dependencies"]}
+    assert versions == {"json": None, "_pytest": version("pytest")}
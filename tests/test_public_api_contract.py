@@ -11,12 +11,16 @@ def test_public_api_exports_expected_symbols():
         "get_info",
         "dep_digest",
         "LazyRegistry",
+        "soft_import_guard",
+        "ImportLeakError",
         "DepConfig",
         "resolve_config",
         "register_package_config",
         "unregister_package_config",
         "temporary_package_config",
         "clear_package_configs",
+        "get_config_epoch",
+        "set_instrumentation_policy",
     }
     assert set(depdigest.__all__) == expected
 
@@ -40,13 +44,14 @@ def test_get_info_schema_contract_is_stable():
 
     payload = depdigest.get_info("contract_pkg", format="dict")
 
-    assert payload["schema"] == {"name": "depdigest.get_info", "version": "1.0"}
+    assert payload["schema"] == {"name": "depdigest.get_info", "version": "1.1"}
     assert set(payload.keys()) == {
         "schema",
         "module_path",
         "dependency_count",
         "installed_count",
         "missing_count",
+        "incompatible_count",
         "dependencies",
     }
     assert isinstance(payload["dependencies"], list)
@@ -55,6 +60,8 @@ def test_get_info_schema_contract_is_stable():
         "library",
         "installed",
         "status",
+        "version",
+        "version_spec",
         "type",
         "package_name",
         "install",
@@ -0,0 +1,49 @@
+import pytest
+
+from depdigest.utils.version_tools import parse_specifier, parse_version, version_matches
+
+
+def test_parse_version_orders_dev_pre_final_and_post_releases():
+    ordered = ["1.0.dev0", "1.0a1", "1.0rc2", "1.0", "1.0.post0.dev0", "1.0.post1", "1.1"]
+    keys = [parse_version(version) for version in ordered]
+    assert keys == sorted(keys)
+    assert parse_version("1.0") == parse_version("1.0.0")
+
+
+@pytest.mark.parametrize(
+    "version,specifier,expected",
+    [
+        ("1.4.5", ">=1.2,<2", True),
+        ("2.0", ">=1.2,<2", False),
+        ("1.4.5", "~=1.4.2", True),
+        ("1.5.0", "~=1.4.2", False),
+        ("1.2.3", "==1.2.*", True),
+        ("1.3.0", "!=1.2.*", True),
+        ("1.0+local", "==1.0", True),
+        ("2.0rc1", ">=2.0", False),
+        ("2.0rc1", ">=2.0rc1", True),
+        ("1.7.post1", ">1.7", False),
+        ("1.7.post2", ">1.7.post1", True),
+        ("1.7.1", ">1.7", True),
+        ("2.0rc1", "<2.0", False),
+        ("2.0a1", "<2.0rc1", True),
+        ("1.9", "<2.0", True),
+        (None, ">=1.0", False),
+    ],
+)
+def test_version_matches_specifiers(version, specifier, expected):
+    assert version_matches(version, specifier) is expected
+
+
+@pytest.mark.parametrize("specifier", ["", ">=", "~=1", ">=1.*", "=>1.0"])
+def test_parse_specifier_rejects_invalid_specifiers(specifier):
+    with pytest.raises(ValueError):
+        parse_specifier(specifier)
+
+
+@pytest.mark.parametrize(
+    "version,specifier",
+    [("8.2.0.dev0", ">=8"), ("2.0.0rc1", ">=1.20"), ("2.0rc1", ">=1.0,<3")],
+)
+def test_version_matches_accepts_installed_pre_and_dev_releases(version, specifier):
+    assert version_matches(version, specifier) is True